@@ -0,0 +1,90 @@
+"""Benchmark of the paragraph diff on growing documents.
+
+Generates documents of doubling size up to ``--max-paragraphs`` and edits about
+``--edit-rate`` of their paragraphs (word changes, inserts, deletes and moves,
+spread over the whole document), then times ``dmfo.compare.diff_paragraphs``.
+The time per paragraph stays about the same from row to row if the diff scales
+near-linearly; the last column is the growth of the run time relative to the
+previous row (2.0 is linear for doubling sizes).
+
+Usage (from the repository root):
+
+    python benchmarks/diff_scaling.py --max-paragraphs 200000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+# The dmfo package parses the command line when it is imported
+_argv, sys.argv = sys.argv, ["dmfo", "index"]
+from dmfo.compare import diff_paragraphs  # noqa: E402
+
+sys.argv = _argv
+
+WORDS = (
+    "the of and to in is was for on that with as by at from this be or are an "
+    "document paragraph section table figure revision office merge diff change"
+).split()
+
+
+def make_documents(
+    paragraphs: int, edit_rate: float, seed: int
+) -> tuple[list[str], list[str]]:
+    rng = random.Random(seed)
+    old = []
+    for idx in range(paragraphs):
+        if idx % 20 == 0:
+            old.append("")  # Empty paragraphs repeat throughout real documents
+        else:
+            words = rng.choices(WORDS, k=rng.randint(5, 30))
+            old.append(f"{idx}. " + " ".join(words))
+    new = list(old)
+    for _ in range(int(paragraphs * edit_rate)):
+        idx = rng.randrange(len(new))
+        kind = rng.random()
+        if kind < 0.5:
+            new[idx] = new[idx].replace(" the ", " a ", 1) + " edited"
+        elif kind < 0.7:
+            new.insert(idx, " ".join(rng.choices(WORDS, k=12)))
+        elif kind < 0.9:
+            del new[idx]
+        else:
+            new.insert(rng.randrange(len(new)), new.pop(idx))
+    return old, new
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--min-paragraphs", type=int, default=12_500)
+    parser.add_argument("--max-paragraphs", type=int, default=200_000)
+    parser.add_argument("--edit-rate", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=3, help="best of N runs")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'paragraphs':>10}{'changes':>9}{'seconds':>10}{'us/para':>9}{'growth':>8}")
+    previous = None
+    paragraphs = args.min_paragraphs
+    while paragraphs <= args.max_paragraphs:
+        old, new = make_documents(paragraphs, args.edit_rate, args.seed)
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            changes = diff_paragraphs(old, new)
+            best = min(best, time.perf_counter() - start)
+        growth = f"{best / previous:.2f}" if previous else "-"
+        print(
+            f"{paragraphs:>10}{len(changes):>9}{best:>10.3f}"
+            f"{best / paragraphs * 1e6:>9.2f}{growth:>8}"
+        )
+        previous = best
+        paragraphs *= 2
+
+
+if __name__ == "__main__":
+    main()
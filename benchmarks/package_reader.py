@@ -0,0 +1,150 @@
+"""Benchmark of the shared memory-mapped package reader against ``zipfile``.
+
+Generates a .docx with ``--paragraphs`` paragraphs and reads it ``--reads`` times
+the way one driver run does (central directory index, then the document text),
+once through ``dmfo.ooxml.open_package`` and once through a new
+``zipfile.ZipFile`` per read. Every scenario runs in a fresh interpreter, which
+reports its run time, peak RSS and, on Linux, the read/write system calls of the
+reads (from ``/proc/self/io``). If ``strace`` is installed, all system calls of the
+process are counted as well. The ``import`` scenario only imports the modules and
+gives the baseline of the other rows.
+
+Usage (Linux/macOS, from the repository root):
+
+    python benchmarks/package_reader.py --paragraphs 100000 --reads 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import resource
+import shutil
+import subprocess  # nosec
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import Optional
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+WORD_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+SCENARIOS = ["import", "shared", "zipfile"]
+# Lines of an strace log that are not a system call (signals, exits, the second
+# half of calls interrupted by another thread)
+STRACE_SKIP_RE = re.compile(r"^(?:\d+\s+)?(?:\+\+\+|---|<\.\.\. )")
+
+
+def make_document(filename: Path, paragraphs: int) -> None:
+    body = "".join(
+        f"<w:p><w:r><w:t>Paragraph {idx} of the benchmark document</w:t></w:r></w:p>"
+        for idx in range(paragraphs)
+    )
+    with zipfile.ZipFile(filename, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", "<Types/>")
+        archive.writestr(
+            "word/document.xml",
+            f'<w:document xmlns:w="{WORD_NS}"><w:body>{body}</w:body></w:document>',
+        )
+
+
+def io_syscalls() -> Optional[int]:
+    """Returns the number of read and write system calls of this process so far."""
+    try:
+        with open("/proc/self/io", encoding="ascii") as fileobj:
+            counters = dict(line.split(": ") for line in fileobj.read().splitlines())
+    except OSError:
+        return None
+    return int(counters["syscr"]) + int(counters["syscw"])
+
+
+def run_scenario(scenario: str, filename: Path, reads: int) -> None:
+    """Runs in the child process, prints its results as JSON."""
+    sys.path.insert(0, str(SRC_DIR))
+    # The dmfo package parses the command line when it is imported
+    sys.argv = ["dmfo", "index"]
+    from dmfo.ooxml import iter_paragraphs, open_package, part_index
+
+    count = 0
+    start_syscalls = io_syscalls()
+    start = time.perf_counter()
+    for _ in range(reads if scenario != "import" else 0):
+        if scenario == "shared":
+            part_index(filename)
+            with open_package(filename).open("word/document.xml") as stream:
+                count = sum(1 for _ in iter_paragraphs(stream))
+        else:
+            with zipfile.ZipFile(filename) as archive:
+                {
+                    info.filename: (info.CRC, info.file_size)
+                    for info in archive.infolist()
+                }
+            with zipfile.ZipFile(filename) as archive:
+                with archive.open("word/document.xml") as stream:
+                    count = sum(1 for _ in iter_paragraphs(stream))
+    elapsed = time.perf_counter() - start
+    end_syscalls = io_syscalls()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":  # Bytes instead of KiB
+        peak //= 1024
+    result = {"paragraphs": count, "seconds": elapsed, "peak_kib": peak}
+    if start_syscalls is not None and end_syscalls is not None:
+        result["io_syscalls"] = end_syscalls - start_syscalls
+    print(json.dumps(result))
+
+
+def measure(scenario: str, filename: Path, reads: int, strace: Optional[str]) -> dict:
+    cmd = [sys.executable, __file__, "--run", scenario, str(filename), str(reads)]
+    syscalls = None
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        if strace:
+            trace = Path(tmp_dir) / "strace.txt"
+            cmd = [strace, "-f", "-o", str(trace), *cmd]
+        output = subprocess.run(  # nosec
+            cmd, check=True, stdout=subprocess.PIPE, text=True
+        ).stdout
+        if strace:
+            with open(trace, encoding="utf-8", errors="replace") as lines:
+                syscalls = sum(not STRACE_SKIP_RE.match(line) for line in lines)
+    result = json.loads(output.splitlines()[-1])
+    result["syscalls"] = syscalls
+    return result
+
+
+def main() -> None:
+    if len(sys.argv) == 5 and sys.argv[1] == "--run":
+        run_scenario(sys.argv[2], Path(sys.argv[3]), int(sys.argv[4]))
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--paragraphs", type=int, default=100_000)
+    parser.add_argument("--reads", type=int, default=5)
+    parser.add_argument("--no-strace", action="store_true")
+    args = parser.parse_args()
+    strace = None if args.no_strace else shutil.which("strace")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = Path(tmp_dir) / "benchmark.docx"
+        make_document(filename, args.paragraphs)
+        print(
+            f"{args.paragraphs} paragraphs, {os.path.getsize(filename)} bytes, "
+            f"{args.reads} reads per scenario"
+        )
+        print(
+            f"{'scenario':<10}{'seconds':>10}{'peak RSS (MiB)':>16}"
+            f"{'read/write calls':>18}{'all syscalls':>14}"
+        )
+        for scenario in SCENARIOS:
+            result = measure(scenario, filename, args.reads, strace)
+            print(
+                f"{scenario:<10}{result['seconds']:>10.3f}"
+                f"{result['peak_kib'] / 1024:>16.1f}"
+                f"{result.get('io_syscalls', 'n/a'):>18}"
+                f"{'n/a' if result['syscalls'] is None else result['syscalls']:>14}"
+            )
+
+
+if __name__ == "__main__":
+    main()
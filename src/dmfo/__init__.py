@@ -1,17 +1,18 @@
 import argparse
 import logging
-import logging.handlers
-import shutil
 import sys
-import tempfile
 from importlib import metadata
 from pathlib import Path
 
 import colorlog
 
+import dmfo.check
 import dmfo.driver
 import dmfo.files
+import dmfo.index
 import dmfo.installer
+import dmfo.logsink
+import dmfo.watch
 from dmfo.classes import VCSFileData
 
 try:
@@ -21,7 +22,7 @@ except metadata.PackageNotFoundError:
 
 logger = logging.getLogger(__name__)
 
-DEFAULT_LOG_PATH = Path(".")
+DEFAULT_LOG_PATH = dmfo.logsink.LOG_DIR
 
 
 def parse_args() -> argparse.Namespace:
@@ -101,6 +102,11 @@ def parse_args() -> argparse.Namespace:
         help="new-mode",
         metavar="RFMode",
     )
+    diff_parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="diff without Office, comparing paragraphs",
+    )
 
     merge_parser = subparser.add_parser("merge", help="Run merge driver")
     merge_parser.add_argument(
@@ -149,11 +155,83 @@ def parse_args() -> argparse.Namespace:
         help="Scope",
     )
 
+    check_parser = subparser.add_parser(
+        "check",
+        help="Check staged documents for tracked changes, comments and anomalies",
+    )
+    check_parser.add_argument(
+        "-a",
+        "--all",
+        action="store_true",
+        help="check all tracked documents instead of the staged ones",
+    )
+    check_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=0,
+        help="number of parallel scans (0: number of CPUs)",
+    )
+
+    index_parser = subparser.add_parser(
+        "index", help="Update the document similarity index of the repository"
+    )
+    index_parser.add_argument(
+        "-q",
+        "--query",
+        type=Path,
+        default=None,
+        help="list the indexed documents most similar to this file",
+        metavar="FILE",
+    )
+    index_parser.add_argument(
+        "-n",
+        "--max-results",
+        type=int,
+        default=5,
+        help="number of similar documents to list",
+    )
+    index_parser.add_argument(
+        "--no-update",
+        action="store_true",
+        help="query the index as is, without indexing new documents first",
+    )
+
+    watch_parser = subparser.add_parser(
+        "watch", help="Re-diff a document against a base version on every save"
+    )
+    watch_parser.add_argument(
+        "BaseFileName",
+        type=Path,
+        help="base version to compare against",
+        metavar="BFName",
+    )
+    watch_parser.add_argument(
+        "WorkingFileName",
+        type=Path,
+        help="document being edited",
+        metavar="WFName",
+    )
+    watch_parser.add_argument(
+        "--html",
+        type=Path,
+        default=None,
+        help="also write the diff to this HTML file (reloading itself)",
+        metavar="FILE",
+    )
+    watch_parser.add_argument(
+        "-i",
+        "--interval",
+        type=float,
+        default=0.5,
+        help="polling interval in seconds, if inotify is not available",
+    )
+
     return parser.parse_args()
 
 
 def setup_root_logger(path: Path = DEFAULT_LOG_PATH) -> logging.Logger:
-    global logfile_path
+    global file_handler, logfile_path
 
     logger = logging.getLogger()
     logger.setLevel(logging.NOTSET)
@@ -166,20 +244,12 @@ def setup_root_logger(path: Path = DEFAULT_LOG_PATH) -> logging.Logger:
         logging.getLogger(module).setLevel(loglevel)
     """
 
-    logfile_path = Path(f"{Path(path) / Path(__file__).stem}.log")
-    log_roll = logfile_path.is_file()
-    file_handler = logging.handlers.RotatingFileHandler(
-        filename=logfile_path,
-        mode="a",
-        backupCount=9,
-        encoding="utf-8",
-    )
-    if log_roll:
-        file_handler.doRollover()
+    logfile_path = Path(path) / "dmfo.log"
+    file_handler = dmfo.logsink.SharedFileHandler(filename=logfile_path)
     file_handler.setLevel(args.log)
     file_handler.setFormatter(
         logging.Formatter(
-            fmt="[%(asctime)s.%(msecs)03d][%(name)s:%(levelname).4s] %(message)s",
+            fmt="[%(asctime)s.%(msecs)03d][%(process)d][%(name)s:%(levelname).4s] %(message)s",
             datefmt="%Y-%m-%dT%H:%M:%S",
         )
     )
@@ -219,8 +289,7 @@ def setup_root_logger(path: Path = DEFAULT_LOG_PATH) -> logging.Logger:
 
 
 args = parse_args()
-TempDir = Path(tempfile.mkdtemp(prefix=f"dmfo_{args.mode}_"))
-root_logger = setup_root_logger(path=TempDir)
+root_logger = setup_root_logger()
 
 
 def main():
@@ -236,9 +305,24 @@ def main():
         "DMFO is logging to '%s'",
         logfile_path,
     )
+    logger.debug("Arguments: %s", sys.argv[1:])
+    dmfo.logsink.cleanup_temp_dirs()
 
     if args.mode == "install":
         ret = dmfo.installer.install(scope=args.scope)
+    elif args.mode == "check":
+        ret = dmfo.check.check(all_files=args.all, jobs=args.jobs)
+    elif args.mode == "index":
+        ret = 0 if args.no_update else dmfo.index.update()
+        if not ret and args.query:
+            ret = dmfo.index.query(filename=args.query, max_results=args.max_results)
+    elif args.mode == "watch":
+        ret = dmfo.watch.watch(
+            base=args.BaseFileName,
+            working=args.WorkingFileName,
+            html_filename=args.html,
+            interval=args.interval,
+        )
     else:
         filedatamap = {
             "LOCAL": VCSFileData(args.LocalFileName),
@@ -248,6 +332,8 @@ def main():
         # extension = args.TargetPath.suffix
         if args.mode == "diff":
             extension = args.DiffPath.suffix
+            filedatamap["LOCAL"].blob_id = args.LocalFileHex
+            filedatamap["REMOTE"].blob_id = args.RemoteFileHex
             logger.debug("Diffing '%s' file.", extension)
         elif args.mode == "merge":
             extension = args.MergeDest.suffix
@@ -260,27 +346,23 @@ def main():
         if ret:
             sys.exit(ret)
 
+        resolved_from = None
         if args.mode == "diff":
-            ret = dmfo.driver.diff(filedata_map=filedatamap)
+            ret = dmfo.driver.diff(filedata_map=filedatamap, headless=args.headless)
         elif args.mode == "merge":
-            ret = dmfo.driver.merge(filedata_map=filedatamap)
-
-        dmfo.files.postproc(filedata_map=filedatamap, mode=args.mode)
+            resolved_from = dmfo.driver.resolve(filedata_map=filedatamap)
+            if resolved_from:
+                ret = 0
+            else:
+                ret = dmfo.driver.merge(filedata_map=filedatamap)
+
+        dmfo.files.postproc(
+            filedata_map=filedatamap, mode=args.mode, resolved_from=resolved_from
+        )
 
     if ret <= 1:
-        logger.debug("Removing log temp dir (%s)", TempDir)
-
-        # Remove all file handlers
-        for handler in filter(
-            lambda handler: isinstance(
-                handler, (logging.FileHandler, logging.handlers.RotatingFileHandler)
-            ),
-            root_logger.handlers,
-        ):
-            handler.close()
-            root_logger.removeHandler(handler)
-
-        shutil.rmtree(TempDir)
+        # Only failed runs are kept in the log
+        file_handler.discard()
     else:
         logger.critical(
             "DMFO %s exited with return code %s, check log for details (%s)",
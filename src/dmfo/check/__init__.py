@@ -0,0 +1,179 @@
+"""Repository scanner for leftovers of reviews and merges.
+
+Reports tracked changes, comments, active Track Changes and embedded-object
+anomalies of the staged (or all tracked) Office documents. Results are cached by
+blob ID and extension in ``.git/dmfo/check.v2.json``, so unchanged documents are
+never scanned twice; larger batches of new blobs are scanned in parallel processes,
+with a bounded number of blobs in flight.
+"""
+from __future__ import annotations
+
+import concurrent.futures
+import json
+import logging
+import multiprocessing
+import os
+import struct
+import sys
+import zipfile
+import zlib
+from pathlib import Path
+from typing import NamedTuple
+from xml.etree.ElementTree import ParseError  # nosec
+from xml.parsers.expat import ExpatError  # nosec
+
+import dmfo.vcs
+from dmfo.ooxml import (
+    Package,
+    count_slide_comments,
+    find_anomalies,
+    scan_revisions,
+)
+
+logger = logging.getLogger(__name__)
+
+CACHE_NAME = "check.v2.json"
+EXTENSIONS = [".docx", ".docm", ".pptx", ".pptm"]
+# Starting worker processes only pays off for larger batches
+PARALLEL_THRESHOLD = 64
+# Blobs read ahead per worker, bounds the memory of queued blob contents
+QUEUE_DEPTH = 2
+# Errors of malformed packages, reported as a finding
+PACKAGE_ERRORS = (
+    zipfile.BadZipFile,
+    ExpatError,
+    ParseError,
+    KeyError,
+    ValueError,
+    struct.error,
+    zlib.error,
+)
+
+
+class CheckResult(NamedTuple):
+    revisions: int = 0
+    comments: int = 0
+    track_revisions: bool = False
+    anomalies: tuple = ()
+
+    def findings(self) -> list[str]:
+        findings = []
+        if self.revisions:
+            findings.append(f"{self.revisions} tracked change(s)")
+        if self.comments:
+            findings.append(f"{self.comments} comment(s)")
+        if self.track_revisions:
+            findings.append("Track Changes is active")
+        findings.extend(self.anomalies)
+        return findings
+
+
+def scan(data: bytes, extension: str) -> CheckResult:
+    try:
+        package = Package(data)
+        anomalies = tuple(find_anomalies(package, extension))
+        if extension.lower().startswith(".ppt"):
+            return CheckResult(
+                comments=count_slide_comments(package), anomalies=anomalies
+            )
+        report = scan_revisions(package)
+    except PACKAGE_ERRORS as exc:
+        return _unreadable(exc)
+    return CheckResult(
+        report.revisions, report.comments, report.track_revisions, anomalies
+    )
+
+
+def _unreadable(exc: BaseException) -> CheckResult:
+    return CheckResult(anomalies=(f"unreadable package ({exc})",))
+
+
+def _cache_key(blob_id: str, extension: str) -> str:
+    return f"{blob_id}{extension.lower()}"
+
+
+def _collect(
+    futures: dict[concurrent.futures.Future, str], results: dict[str, CheckResult]
+) -> None:
+    for future in futures:
+        try:
+            results[futures[future]] = future.result()
+        except Exception as exc:  # Raised in or while talking to the worker
+            logger.debug("Scan of '%s' failed: '%s'", futures[future], exc)
+            results[futures[future]] = _unreadable(exc)
+
+
+def _scan_blobs(blobs: dict[str, set[str]], jobs: int) -> dict[str, CheckResult]:
+    """Scans each blob as each of its extensions, returns the results by cache
+    key.
+    """
+    results: dict[str, CheckResult] = {}
+    contents = dmfo.vcs.cat_blobs(blobs)
+    if len(blobs) < PARALLEL_THRESHOLD or jobs == 1:
+        for blob_id, data in contents:
+            for extension in blobs[blob_id]:
+                results[_cache_key(blob_id, extension)] = scan(data, extension)
+        return results
+
+    # Forked workers would inherit the pipe to 'git cat-file' and keep it open
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=jobs, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        pending: dict[concurrent.futures.Future, str] = {}
+        for blob_id, data in contents:
+            for extension in blobs[blob_id]:
+                future = executor.submit(scan, data, extension)
+                pending[future] = _cache_key(blob_id, extension)
+            if len(pending) >= jobs * QUEUE_DEPTH:
+                done, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                _collect({future: pending.pop(future) for future in done}, results)
+        _collect(pending, results)
+    return results
+
+
+def check(all_files: bool = False, jobs: int = 0) -> int:
+    """Return codes:
+    0: No findings
+    1: Findings in at least one document
+    """
+    tracked = dmfo.vcs.ls_files(EXTENSIONS)
+    if not all_files:
+        staged = dmfo.vcs.staged_paths()
+        tracked = {path: blob for path, blob in tracked.items() if path in staged}
+    if not tracked:
+        logger.debug("No documents to check.")
+        return 0
+
+    cache_path = dmfo.vcs.dmfo_dir() / CACHE_NAME
+    try:
+        cache = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        cache = {}
+
+    keys = {path: _cache_key(blob, Path(path).suffix) for path, blob in tracked.items()}
+    blobs: dict[str, set[str]] = {}
+    for path, blob in tracked.items():
+        if keys[path] not in cache:
+            blobs.setdefault(blob, set()).add(Path(path).suffix.lower())
+    logger.debug("Checking %s documents, %s blobs not cached", len(tracked), len(blobs))
+    if blobs:
+        results = _scan_blobs(blobs, jobs or os.cpu_count() or 1)
+        cache.update((key, list(result)) for key, result in results.items())
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(cache), encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+
+    ret = 0
+    for path in sorted(tracked):
+        if keys[path] not in cache:
+            continue
+        revisions, comments, track_revisions, anomalies = cache[keys[path]]
+        findings = CheckResult(
+            revisions, comments, track_revisions, tuple(anomalies)
+        ).findings()
+        if findings:
+            ret = 1
+            sys.stdout.write(f"{path}: {'; '.join(findings)}\n")
+    return ret
@@ -1,11 +1,13 @@
 from pathlib import Path
+from typing import Optional
 
 
 class VCSFileData:
     target_ext: str
 
-    def __init__(self, name):
+    def __init__(self, name, blob_id=None):
         self.name: Path = name
+        self.blob_id: Optional[str] = blob_id
         self.fileobj: object
         self.is_lfs: bool
 
@@ -0,0 +1,3 @@
+from .merge import merge3
+from .paragraphs import Change, diff_paragraphs, refine
+from .sequence import matching_blocks, opcodes
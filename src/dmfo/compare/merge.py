@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from typing import Hashable, Sequence
+
+from dmfo.compare.sequence import opcodes
+
+
+def merge3(
+    base: Sequence[Hashable], local: Sequence[Hashable], remote: Sequence[Hashable]
+) -> tuple[list, int]:
+    """Three-way merge (diff3) of sequences. Changes of ``local`` and ``remote``
+    against ``base`` are combined if they do not overlap or touch, or if both sides
+    made the same change. Returns the merged sequence and the number of conflicts,
+    conflicting regions are taken from ``local``.
+    """
+    # (base start, base end, side, replacement), side 0 is local, 1 is remote
+    hunks = []
+    for side, seq in enumerate([local, remote]):
+        hunks.extend(
+            (i1, i2, side, list(seq[j1:j2]))
+            for tag, i1, i2, j1, j2 in opcodes(base, seq)
+            if tag != "equal"
+        )
+    hunks.sort(key=lambda hunk: hunk[:3])
+
+    merged: list = []
+    conflicts = 0
+    pos = 0
+    idx = 0
+    while idx < len(hunks):
+        group = [hunks[idx]]
+        start, end = hunks[idx][:2]
+        idx += 1
+        while idx < len(hunks) and hunks[idx][0] <= end:
+            group.append(hunks[idx])
+            end = max(end, hunks[idx][1])
+            idx += 1
+
+        results = {}
+        for side in {hunk[2] for hunk in group}:
+            result = []
+            side_pos = start
+            for i1, i2, _, replacement in (hunk for hunk in group if hunk[2] == side):
+                result.extend(base[side_pos:i1])
+                result.extend(replacement)
+                side_pos = i2
+            result.extend(base[side_pos:end])
+            results[side] = result
+
+        merged.extend(base[pos:start])
+        if len(results) == 2 and results[0] != results[1]:
+            conflicts += 1
+        merged.extend(results[min(results)])
+        pos = end
+    merged.extend(base[pos:])
+    return merged, conflicts
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import re
+from typing import NamedTuple, Optional, Sequence
+
+from dmfo.compare.sequence import opcodes
+
+WORD_RE = re.compile(r"\w+|\s+|[^\w\s]")
+
+# Replaced paragraphs sharing less than this fraction of words are reported as
+# delete + insert instead of being refined word by word
+MIN_SIMILARITY = 0.3
+
+
+class Change(NamedTuple):
+    tag: str  # "delete", "insert", "replace" or "move"
+    old_index: int  # -1 for inserts
+    new_index: int  # -1 for deletes
+    old_text: str
+    new_text: str
+    words: tuple  # ((tag, old_words, new_words), ...) for "replace"
+
+
+def refine(old: str, new: str) -> tuple[float, tuple]:
+    """Word level diff of a replaced paragraph pair. Returns the similarity (shared
+    fraction of words) and the ``(tag, old_words, new_words)`` segments.
+    """
+    old_words = WORD_RE.findall(old)
+    new_words = WORD_RE.findall(new)
+    segments = []
+    same = 0
+    for tag, i1, i2, j1, j2 in opcodes(old_words, new_words):
+        if tag == "equal":
+            same += i2 - i1
+        segments.append((tag, "".join(old_words[i1:i2]), "".join(new_words[j1:j2])))
+    total = max(len(old_words), len(new_words))
+    return (same / total if total else 1.0), tuple(segments)
+
+
+def diff_paragraphs(
+    old: Sequence[str], new: Sequence[str], cache: Optional[dict] = None
+) -> list[Change]:
+    """Aligns two paragraph lists and returns the changes between them, ordered by
+    their position in ``new``. Paragraphs are matched by content, deleted paragraphs
+    reappearing elsewhere are reported as moves, and only replaced paragraph pairs
+    are diffed on word level. Word level results are kept in ``cache`` (keyed by
+    the paragraph pair) if given, for repeated diffs of a changing document.
+    """
+    # Deletions are anchored to the position in ``new`` they occurred at
+    deleted: list[tuple[int, int]] = []
+    inserted: list[int] = []
+    replaced: list[tuple[int, int]] = []
+    for tag, i1, i2, j1, j2 in opcodes(old, new):
+        if tag == "equal":
+            continue
+        pairs = min(i2 - i1, j2 - j1) if tag == "replace" else 0
+        replaced.extend(zip(range(i1, i1 + pairs), range(j1, j1 + pairs)))
+        deleted.extend((i, j1 + pairs) for i in range(i1 + pairs, i2))
+        inserted.extend(range(j1 + pairs, j2))
+
+    changes = []
+
+    # Move detection: pair inserted paragraphs with deleted ones of equal content
+    deleted_by_text: dict[str, list[int]] = {}
+    for i, _ in reversed(deleted):
+        if old[i].strip():
+            deleted_by_text.setdefault(old[i], []).append(i)
+    moved_old = set()
+    moved_new = set()
+    for j in inserted:
+        candidates = deleted_by_text.get(new[j])
+        if candidates:
+            i = candidates.pop()
+            moved_old.add(i)
+            moved_new.add(j)
+            changes.append(Change("move", i, j, old[i], new[j], ()))
+
+    for i, j in replaced:
+        if cache is None:
+            similarity, words = refine(old[i], new[j])
+        else:
+            key = (old[i], new[j])
+            if key not in cache:
+                cache[key] = refine(*key)
+            similarity, words = cache[key]
+        if similarity < MIN_SIMILARITY:
+            changes.append(Change("delete", i, -1, old[i], "", ()))
+            changes.append(Change("insert", -1, j, "", new[j], ()))
+        else:
+            changes.append(Change("replace", i, j, old[i], new[j], words))
+    changes.extend(
+        Change("delete", i, -1, old[i], "", ())
+        for i, _ in deleted
+        if i not in moved_old
+    )
+    changes.extend(
+        Change("insert", -1, j, "", new[j], ()) for j in inserted if j not in moved_new
+    )
+
+    position = {i: j for i, j in deleted}
+    position.update((i, j) for i, j in replaced)
+    changes.sort(
+        key=lambda change: (
+            change.new_index if change.new_index != -1 else position[change.old_index],
+            change.tag != "delete",
+            change.old_index,
+        )
+    )
+    return changes
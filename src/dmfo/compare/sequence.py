@@ -0,0 +1,146 @@
+"""Patience/histogram sequence alignment.
+
+Works on sequences of hashable items (paragraph texts, words, ...). The items are
+interned to integers once, unique common items are used as anchors (patience diff)
+and ranges without unique anchors fall back to the least frequent common item
+(histogram diff). Both keep the cost close to linear for document-sized inputs,
+unlike the O(N*M) worst case of ``difflib.SequenceMatcher``.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Hashable, Sequence
+
+# Items occurring more often than this in a range are not used as histogram anchors
+MAX_CHAIN = 64
+
+
+def _intern(a: Sequence[Hashable], b: Sequence[Hashable]) -> tuple[list, list]:
+    ids: dict[Hashable, int] = {}
+    a_ids = [ids.setdefault(item, len(ids)) for item in a]
+    b_ids = [ids.setdefault(item, len(ids)) for item in b]
+    return a_ids, b_ids
+
+
+def _lis(pairs: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Returns the longest subsequence of ``pairs`` (sorted by first element) that
+    is increasing in the second element (patience sorting).
+    """
+    tails: list[int] = []
+    tail_idx: list[int] = []
+    prev = [-1] * len(pairs)
+    for idx, (_, j) in enumerate(pairs):
+        pos = bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_idx.append(idx)
+        else:
+            tails[pos] = j
+            tail_idx[pos] = idx
+        prev[idx] = tail_idx[pos - 1] if pos else -1
+
+    result = []
+    idx = tail_idx[-1] if tail_idx else -1
+    while idx != -1:
+        result.append(pairs[idx])
+        idx = prev[idx]
+    result.reverse()
+    return result
+
+
+def _anchors(
+    a: list[int], b: list[int], alo: int, ahi: int, blo: int, bhi: int
+) -> list[tuple[int, int]]:
+    counts: dict[int, list[int]] = {}
+    for i in range(alo, ahi):
+        entry = counts.get(a[i])
+        if entry is None:
+            counts[a[i]] = [1, i, 0, -1]
+        else:
+            entry[0] += 1
+    for j in range(blo, bhi):
+        entry = counts.get(b[j])
+        if entry is not None:
+            entry[2] += 1
+            if entry[3] == -1:
+                entry[3] = j
+
+    unique = sorted(
+        (i, j) for count_a, i, count_b, j in counts.values() if count_a == count_b == 1
+    )
+    if unique:
+        return _lis(unique)
+
+    # Histogram fallback: anchor on the least frequent item common to both ranges
+    best = None
+    for count_a, i, count_b, j in counts.values():
+        if count_b and count_a <= MAX_CHAIN and (best is None or count_a < best[0]):
+            best = (count_a, i, j)
+    return [best[1:]] if best else []
+
+
+def matching_blocks(
+    a: Sequence[Hashable], b: Sequence[Hashable]
+) -> list[tuple[int, int, int]]:
+    """Returns ``(i, j, n)`` triples with ``a[i:i+n] == b[j:j+n]``, monotonically
+    increasing in ``i`` and ``j`` and terminated by ``(len(a), len(b), 0)`` (same
+    contract as ``difflib.SequenceMatcher.get_matching_blocks``).
+    """
+    a_ids, b_ids = _intern(a, b)
+    matches: list[tuple[int, int]] = []
+    stack = [(0, len(a_ids), 0, len(b_ids))]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+        # Common prefix and suffix
+        while alo < ahi and blo < bhi and a_ids[alo] == b_ids[blo]:
+            matches.append((alo, blo))
+            alo += 1
+            blo += 1
+        while alo < ahi and blo < bhi and a_ids[ahi - 1] == b_ids[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+            matches.append((ahi, bhi))
+        if alo == ahi or blo == bhi:
+            continue
+
+        anchors = _anchors(a_ids, b_ids, alo, ahi, blo, bhi)
+        if not anchors:
+            continue
+        for i, j in anchors:
+            matches.append((i, j))
+            stack.append((alo, i, blo, j))
+            alo, blo = i + 1, j + 1
+        stack.append((alo, ahi, blo, bhi))
+
+    matches.sort()
+    blocks: list[tuple[int, int, int]] = []
+    for i, j in matches:
+        if blocks:
+            bi, bj, n = blocks[-1]
+            if bi + n == i and bj + n == j:
+                blocks[-1] = (bi, bj, n + 1)
+                continue
+        blocks.append((i, j, 1))
+    blocks.append((len(a_ids), len(b_ids), 0))
+    return blocks
+
+
+def opcodes(
+    a: Sequence[Hashable], b: Sequence[Hashable]
+) -> list[tuple[str, int, int, int, int]]:
+    """Returns ``(tag, i1, i2, j1, j2)`` tuples describing how to turn ``a`` into
+    ``b`` (same contract as ``difflib.SequenceMatcher.get_opcodes``).
+    """
+    result = []
+    i = j = 0
+    for ai, bj, n in matching_blocks(a, b):
+        if i < ai and j < bj:
+            result.append(("replace", i, ai, j, bj))
+        elif i < ai:
+            result.append(("delete", i, ai, j, bj))
+        elif j < bj:
+            result.append(("insert", i, ai, j, bj))
+        if n:
+            result.append(("equal", ai, ai + n, bj, bj + n))
+        i, j = ai + n, bj + n
+    return result
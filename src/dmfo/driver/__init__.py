@@ -1,21 +1,39 @@
 import logging
+import sys
 from pathlib import Path
 from typing import Dict
 
 import dmfo.driver.differ
 import dmfo.driver.merger
+import dmfo.extract
+import dmfo.odf
 from dmfo.classes import VCSFileData
+from dmfo.driver.resolver import resolve
+from dmfo.ooxml import release_packages
 
 logger = logging.getLogger(__name__)
 
 
-def diff(filedata_map: Dict[str, object]) -> int:
+def diff(filedata_map: Dict[str, object], headless: bool = False) -> int:
     filedata_map["DIFF"] = VCSFileData(Path())
 
     extension = VCSFileData.target_ext
-    if extension in [".doc", ".docx"]:
+    if extension in dmfo.odf.EXTENSIONS:
+        headless = True
+    elif sys.platform != "win32" and not headless:
+        logger.debug("No COM support on '%s', diffing headless.", sys.platform)
+        headless = True
+
+    if headless and dmfo.extract.supports(extension):
+        ret = dmfo.driver.differ.headless(filedata_map=filedata_map)
+    elif headless:
+        logger.critical("DMFO-Diff cannot diff '%s' files without Office.", extension)
+        ret = 2
+    elif extension in [".doc", ".docx"]:
+        release_packages()
         ret = dmfo.driver.differ.wd(filedata_map=filedata_map)
     elif extension in [".ppt", ".pptx"]:
+        release_packages()
         ret = dmfo.driver.differ.pp(filedata_map=filedata_map)
     else:
         logger.critical(
@@ -31,7 +49,13 @@ def merge(filedata_map: Dict[str, object]) -> int:
     filedata_map["MERGE"] = VCSFileData(Path())
 
     extension = VCSFileData.target_ext
-    if extension in [".doc", ".docx"]:
+    if extension in dmfo.odf.EXTENSIONS:
+        ret = dmfo.driver.merger.odf(filedata_map=filedata_map)
+    elif sys.platform != "win32":
+        logger.critical("DMFO-Merge requires Microsoft Office (COM) on Windows.")
+        ret = 3
+    elif extension in [".doc", ".docx"]:
+        release_packages()
         ret = dmfo.driver.merger.wd(filedata_map=filedata_map)
     else:
         logger.critical(
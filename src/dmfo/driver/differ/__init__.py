@@ -1,2 +1,7 @@
-from .pp import pp
-from .wd import wd
+import sys
+
+from .headless import headless
+
+if sys.platform == "win32":
+    from .pp import pp
+    from .wd import wd
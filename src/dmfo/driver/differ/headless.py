@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import logging
+import sys
+from typing import Iterable, Iterator
+
+import dmfo.extract
+from dmfo.classes import VCSFileData
+from dmfo.compare import Change, diff_paragraphs
+from dmfo.ooxml import MediaChange, compare_media
+
+logger = logging.getLogger(__name__)
+
+# Formats with media parts, legacy binary formats are compared by text only
+PACKAGE_EXTENSIONS = [".docx", ".pptx", ".odt", ".odp", ".ods"]
+
+
+def _format_words(words: tuple) -> Iterator[str]:
+    for tag, old, new in words:
+        if tag == "equal":
+            yield old
+            continue
+        if old:
+            yield f"[-{old}-]"
+        if new:
+            yield f"{{+{new}+}}"
+
+
+def format_changes(changes: Iterable[Change]) -> Iterator[str]:
+    """Renders changes as text lines, word level changes use the ``git diff
+    --word-diff`` markers.
+    """
+    for change in changes:
+        if change.tag == "delete":
+            yield f"@@ -{change.old_index + 1} @@"
+            yield f"-{change.old_text}"
+        elif change.tag == "insert":
+            yield f"@@ +{change.new_index + 1} @@"
+            yield f"+{change.new_text}"
+        elif change.tag == "move":
+            yield f"@@ -{change.old_index + 1} => +{change.new_index + 1} @@"
+            yield f">{change.new_text}"
+        else:
+            yield f"@@ -{change.old_index + 1} +{change.new_index + 1} @@"
+            yield "~" + "".join(_format_words(change.words))
+
+
+def format_media(changes: Iterable[MediaChange]) -> Iterator[str]:
+    for change in changes:
+        yield "@@ media @@"
+        if change.tag == "remove":
+            yield f"-{change.old_part}"
+        elif change.tag == "add":
+            yield f"+{change.new_part}"
+        elif change.similarity is None:
+            yield f"~{change.old_part} => {change.new_part}"
+        else:
+            yield (
+                f"~{change.old_part} => {change.new_part}"
+                f" (similarity {change.similarity:.0%})"
+            )
+
+
+def headless(filedata_map: dict[str, object]) -> int:
+    extension = VCSFileData.target_ext
+    if not dmfo.extract.supports(extension):
+        logger.critical("Headless diff does not support '%s' files.", extension)
+        return 2
+
+    paragraphs = {}
+    for alias in ["LOCAL", "REMOTE"]:
+        filename = filedata_map[alias].get_name()
+        logger.debug("Reading '%s' ('%s')", alias, filename)
+        paragraphs[alias] = dmfo.extract.paragraphs(
+            filename, extension, blob_id=filedata_map[alias].blob_id
+        )
+        logger.debug("Done, %s paragraphs", len(paragraphs[alias]))
+
+    logger.debug("Diffing 'REMOTE' vs 'LOCAL'")
+    changes = diff_paragraphs(paragraphs["LOCAL"], paragraphs["REMOTE"])
+    logger.debug("Done, %s changes", len(changes))
+
+    media_changes = []
+    if extension.lower() in PACKAGE_EXTENSIONS:
+        logger.debug("Comparing media of 'REMOTE' vs 'LOCAL'")
+        media_changes = compare_media(
+            filedata_map["LOCAL"].get_name(), filedata_map["REMOTE"].get_name()
+        )
+        logger.debug("Done, %s changes", len(media_changes))
+
+    for line in format_changes(changes):
+        sys.stdout.write(line + "\n")
+    for line in format_media(media_changes):
+        sys.stdout.write(line + "\n")
+    return 0
@@ -1 +1,6 @@
-from .wd import wd
+import sys
+
+from .odf import odf
+
+if sys.platform == "win32":
+    from .wd import wd
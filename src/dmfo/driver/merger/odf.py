@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import logging
+import os
+import struct
+import zipfile
+import zlib
+
+from dmfo.odf import merge_packages
+from dmfo.ooxml import release_packages
+
+logger = logging.getLogger(__name__)
+
+
+def odf(filedata_map: dict[str, object]) -> int:
+    filenames = {
+        alias: filedata_map[alias].get_name() for alias in ["BASE", "LOCAL", "REMOTE"]
+    }
+    destination = filenames["LOCAL"]
+    tmp_filename = destination.with_name(f"{destination.name}.{os.getpid()}.tmp")
+
+    base = filenames["BASE"]
+    if base.stat().st_size == 0:
+        # Git passes an empty BASE if the file was added on both sides
+        logger.debug("No common ancestor, all parts are new on both sides")
+        base = None
+
+    logger.debug("Merging 'LOCAL' and 'REMOTE'")
+    try:
+        try:
+            with open(tmp_filename, "wb") as fileobj:
+                conflicts = merge_packages(
+                    base, filenames["LOCAL"], filenames["REMOTE"], fileobj
+                )
+        except (zipfile.BadZipFile, KeyError, struct.error, zlib.error) as exc:
+            logger.warning("Cannot read packages: '%s'", exc)
+            logger.info("Could not merge automatically, keeping 'LOCAL'.")
+            return 1
+        if conflicts:
+            for name in conflicts:
+                logger.warning("Conflicting changes in '%s'.", name)
+            logger.info("Could not merge automatically, keeping 'LOCAL'.")
+            return 1
+        logger.debug("Done")
+
+        release_packages()
+        os.replace(tmp_filename, destination)
+    finally:
+        if tmp_filename.exists():
+            tmp_filename.unlink()
+    logger.info("Merged without conflicts.")
+    return 0
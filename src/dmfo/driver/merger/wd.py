@@ -1,6 +1,12 @@
 from __future__ import annotations
 
 import logging
+import struct
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Optional
+from xml.parsers.expat import ExpatError  # nosec
 
 import pywintypes  # win32com.client.pywintypes
 
@@ -11,10 +17,37 @@ from dmfo.constants.mso.wd import (
     WdWindowState,
 )
 from dmfo.driver.common import ask_resolved, init_com_obj
+from dmfo.ooxml import scan_revisions
 
 logger = logging.getLogger(__name__)
 
 
+def _reopen_revisions(
+    COMObj: Optional[object], filedata: object, filename: Path  # noqa: N803
+) -> Optional[tuple[bool, int]]:
+    """Opens the saved merge in Word, returns whether Track Changes is active and
+    the number of revisions, or None if Word cannot read it.
+    """
+    if COMObj is None:
+        return None
+    try:
+        COMObj.Visible = False
+        logger.debug("Opening '%s' ('%s')", "MERGE", filename)
+        filedata.fileobj = COMObj.Documents.Open(
+            FileName=str(filename),
+            ConfirmConversions=False,
+            ReadOnly=False,
+            AddToRecentFiles=False,
+        )
+        result = (filedata.fileobj.TrackRevisions, filedata.fileobj.Revisions.Count)
+        filedata.fileobj.Close()
+        logger.debug("Done")
+    except pywintypes.com_error as exc:
+        logger.debug("COM Error: '%s'", exc)
+        return None
+    return result
+
+
 def wd(filedata_map: dict[str, object]) -> int:
     ret, COMObj = init_com_obj("Word")  # noqa: N806
     if ret:
@@ -121,38 +154,60 @@ def wd(filedata_map: dict[str, object]) -> int:
         COMObj.Documents.Item(str(filename))
         logger.debug("'MERGE' is still open.")
     except pywintypes.com_error as exc:
-        reopen = True
+        is_open = False
         if exc.args[0] in [-2147352567]:
-            logger.debug("'MERGE' has been closed, reopening...")
+            logger.debug("'MERGE' has been closed.")
         elif exc.args[0] in [-2147023174, -2147023179]:
-            logger.debug("COMObj has been closed, reinitializing...")
-            ret, COMObj = init_com_obj("Word")  # noqa: N806
-            if ret:
-                return ret
+            logger.debug("COMObj has been closed.")
+            COMObj = None  # noqa: N806
         else:
             logger.error("COM Error: '%s'", exc.args[1])
             logger.debug("COM Error: '%s'", exc)
     else:
-        reopen = False
+        is_open = True
 
-    COMObj.Visible = False
-
-    if reopen:
-        logger.debug("Opening '%s' ('%s')", "MERGE", filedata_map["LOCAL"].name)
-        filedata_map["MERGE"].fileobj = COMObj.Documents.Open(  # noqa: N806
-            FileName=str(filename),
-            ConfirmConversions=False,
-            ReadOnly=False,
-            AddToRecentFiles=False,
-        )
-        logger.debug("Done")
+    if is_open:
+        COMObj.Visible = False
+        track_revisions = filedata_map["MERGE"].fileobj.TrackRevisions
+        revisions = filedata_map["MERGE"].fileobj.Revisions.Count
+        # TODO: progressbar
+        filedata_map["MERGE"].fileobj.Close()
+    else:
+        # Reading the saved package is much cheaper than reopening it in Word
+        logger.debug("Scanning '%s' ('%s')", "MERGE", filename)
+        try:
+            report = scan_revisions(filename)
+        except (
+            zipfile.BadZipFile,
+            ExpatError,
+            KeyError,
+            zlib.error,
+            struct.error,
+        ) as exc:
+            # Saved in another format (e.g. Word 97-2003), only Word can read it
+            logger.debug("Cannot scan 'MERGE': '%s', reopening...", exc)
+            if COMObj is None:
+                _, COMObj = init_com_obj("Word")  # noqa: N806
+            result = _reopen_revisions(COMObj, filedata_map["MERGE"], filename)
+            if result is None:
+                logger.warning(
+                    "Cannot check 'MERGE' for revisions. Will exit as 'unresolved'."
+                )
+                track_revisions, revisions = False, 0
+                is_resolved = False
+            else:
+                track_revisions, revisions = result
+        else:
+            track_revisions = report.track_revisions
+            revisions = report.revisions
+            logger.debug("Done, %s revisions, %s comments", revisions, report.comments)
         # TODO: progressbar
 
-    if filedata_map["MERGE"].fileobj.TrackRevisions:
+    if track_revisions:
         logger.warning("Warning: Track Changes is active. Please deactivate!")
         # Deactivate track changes?
     if is_resolved:
-        if filedata_map["MERGE"].fileobj.Revisions.Count > 0:
+        if revisions > 0:
             is_resolved = False  # TODO: Transfer to ps1 script
             logger.warning(
                 "Warning: Unresolved revisions in the document. "
@@ -160,9 +215,7 @@ def wd(filedata_map: dict[str, object]) -> int:
             )
     # TODO: progressbar
 
-    # TODO: progressbar
-    filedata_map["MERGE"].fileobj.Close()
-    if COMObj.Documents.Count == 0:
+    if COMObj is not None and COMObj.Documents.Count == 0:
         logger.debug("No more open documents in COMObj, closing...")
         COMObj.Quit()
         logger.debug("Done")
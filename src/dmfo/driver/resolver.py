@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import struct
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Optional
+
+from dmfo.ooxml import open_package, part_index
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+# (alias_a, alias_b) are equal -> result is taken from
+RESOLUTIONS = {
+    ("LOCAL", "REMOTE"): "LOCAL",
+    ("BASE", "REMOTE"): "LOCAL",
+    ("BASE", "LOCAL"): "REMOTE",
+}
+
+
+def _digest(filename: Path) -> tuple[int, bytes]:
+    digest = hashlib.sha256()
+    with open(filename, "rb") as fileobj:
+        for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return filename.stat().st_size, digest.digest()
+
+
+def _same_parts(filename_a: Path, filename_b: Path) -> bool:
+    """Compares the decompressed content of all parts of two packages with equal
+    indexes, as equal CRCs and sizes do not guarantee equal content.
+    """
+    try:
+        package_a, package_b = open_package(filename_a), open_package(filename_b)
+        for name in package_a.parts:
+            with package_a.open(name) as stream_a, package_b.open(name) as stream_b:
+                while True:
+                    chunk = stream_a.read(CHUNK_SIZE)
+                    if chunk != stream_b.read(CHUNK_SIZE):
+                        logger.debug("Part '%s' differs despite equal CRC", name)
+                        return False
+                    if not chunk:
+                        break
+    except (zipfile.BadZipFile, KeyError, struct.error, zlib.error) as exc:
+        logger.debug("Cannot compare parts: '%s'", exc)
+        return False
+    return True
+
+
+def resolve(filedata_map: dict[str, object]) -> Optional[str]:
+    """Resolves merges where one side equals BASE or both sides are equal, without
+    starting Office. Returns the alias the result is taken from, or None if a real
+    merge is needed.
+    """
+    filenames = {
+        alias: filedata_map[alias].get_name() for alias in ["BASE", "LOCAL", "REMOTE"]
+    }
+
+    logger.debug("Checking for identical files...")
+    digests = {alias: _digest(filename) for alias, filename in filenames.items()}
+    for pair, result in RESOLUTIONS.items():
+        if digests[pair[0]] == digests[pair[1]]:
+            logger.info("'%s' and '%s' are identical, taking '%s'.", *pair, result)
+            return result
+
+    logger.debug("Checking for identical content...")
+    indexes = {}
+    for alias, filename in filenames.items():
+        try:
+            indexes[alias] = part_index(filename)
+        except zipfile.BadZipFile:
+            indexes[alias] = None
+    for pair, result in RESOLUTIONS.items():
+        if (
+            indexes[pair[0]] is not None
+            and indexes[pair[0]] == indexes[pair[1]]
+            and _same_parts(filenames[pair[0]], filenames[pair[1]])
+        ):
+            logger.info(
+                "'%s' and '%s' have identical content, taking '%s'.", *pair, result
+            )
+            return result
+
+    logger.debug("No trivial resolution")
+    return None
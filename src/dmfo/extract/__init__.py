@@ -0,0 +1,74 @@
+"""Text extraction for the headless engines, dispatched by file extension.
+
+Extracted paragraphs of committed files are cached by blob ID in
+``.git/dmfo/text/v<CACHE_VERSION>/``, so diffing the same revisions again (e.g.
+``git log -p``) does not parse the documents again. ``CACHE_VERSION`` must be
+increased whenever an extractor changes its output.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import subprocess  # nosec
+from pathlib import Path
+from typing import Callable, Optional
+
+import dmfo.vcs
+from dmfo.odf import read_units
+from dmfo.ole import read_doc_paragraphs, read_ppt_paragraphs
+from dmfo.ooxml import read_paragraphs, read_slide_paragraphs
+from dmfo.ooxml.package import Source
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = "text"
+CACHE_VERSION = 1
+BLOB_ID_RE = re.compile(r"[0-9a-f]{40}|[0-9a-f]{64}")
+
+EXTRACTORS: dict[str, Callable[[Source], list[str]]] = {
+    ".doc": read_doc_paragraphs,
+    ".docx": read_paragraphs,
+    ".odp": read_units,
+    ".ods": read_units,
+    ".odt": read_units,
+    ".ppt": read_ppt_paragraphs,
+    ".pptx": read_slide_paragraphs,
+}
+
+
+def supports(extension: str) -> bool:
+    return extension.lower() in EXTRACTORS
+
+
+def _cache_path(blob_id: Optional[str], extension: str) -> Optional[Path]:
+    # Git passes a null ID for files in the work tree
+    if not blob_id or not BLOB_ID_RE.fullmatch(blob_id) or not blob_id.strip("0"):
+        return None
+    try:
+        cache_dir = dmfo.vcs.dmfo_dir() / CACHE_DIR / f"v{CACHE_VERSION}"
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    except (subprocess.CalledProcessError, OSError):
+        return None
+    return cache_dir / f"{blob_id}{extension.lower()}.json"
+
+
+def paragraphs(
+    source: Source, extension: str, blob_id: Optional[str] = None
+) -> list[str]:
+    """Returns the paragraphs (or slide/cell texts) of a document file. If the blob
+    ID of a committed file is given, the result is cached.
+    """
+    cache_path = _cache_path(blob_id, extension)
+    if cache_path is not None and cache_path.is_file():
+        logger.debug("Using cached text of blob '%s'", blob_id)
+        return json.loads(cache_path.read_text(encoding="utf-8"))
+
+    result = EXTRACTORS[extension.lower()](source)
+
+    if cache_path is not None:
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(result), encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+    return result
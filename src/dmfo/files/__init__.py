@@ -3,10 +3,13 @@ import shlex
 import shutil
 import subprocess  # nosec
 import sys
+import zipfile
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
 from dmfo.classes import VCSFileData
+from dmfo.ole import is_compound_file
+from dmfo.ooxml import open_package, release_packages
 
 logger = logging.getLogger(__name__)
 
@@ -26,19 +29,33 @@ def preproc(filedata_map: Dict[str, object]) -> int:
         else:
             has_extension = False
             fices = ["", extension]
+        aux_filename = Path(str(filename).join(fices))
+        if not has_extension:
+            # Overwritten by the blob below if the file is an LFS pointer
+            shutil.copy(filename, aux_filename)
+        # The name the file is read by from here on, so its package mapping is
+        # cached once and shared with the later steps
+        work_filename = filename if has_extension else aux_filename
 
         logger.debug("Checking if is Git LFS pointer...")
-        cmd = f"git lfs pointer --check --file '{filename}'"
-        ret = subprocess.run(  # nosec
-            shlex.split(cmd),
-            stdout=sys.stdout,
-            stderr=sys.stderr,
-        ).returncode
+        try:
+            # A valid package or compound file cannot be a pointer, this saves
+            # starting git-lfs
+            if not is_compound_file(work_filename):
+                open_package(work_filename)
+        except zipfile.BadZipFile:
+            cmd = f"git lfs pointer --check --file '{work_filename}'"
+            ret = subprocess.run(  # nosec
+                shlex.split(cmd),
+                stdout=sys.stdout,
+                stderr=sys.stderr,
+            ).returncode
+        else:
+            ret = 1
         if ret == 0:
             logger.debug("Yes, is LFS pointer")
             is_lfs = True
             logger.info("Converting LFS pointer to blob...")
-            aux_filename = Path(str(filename).join(fices))
             cmd = (
                 "cmd.exe /c 'type "
                 + str(filename)
@@ -57,8 +74,6 @@ def preproc(filedata_map: Dict[str, object]) -> int:
         elif ret == 1:
             logger.debug("No, is not LFS pointer")
             is_lfs = False
-            if not has_extension:
-                shutil.copy(filename, aux_filename)
         elif ret == 2:
             logger.critical("File not found")
             return 4
@@ -67,8 +82,7 @@ def preproc(filedata_map: Dict[str, object]) -> int:
             return 5
         filedata_map[alias].is_lfs = is_lfs
 
-        if not has_extension:
-            filename = aux_filename
+        filename = work_filename
 
         filemode = filename.stat().st_mode
         logger.debug("File has %s mode", oct(filemode))
@@ -81,15 +95,28 @@ def preproc(filedata_map: Dict[str, object]) -> int:
     return 0
 
 
-def postproc(filedata_map: Dict[str, object], mode: str) -> None:
+def postproc(
+    filedata_map: Dict[str, object], mode: str, resolved_from: Optional[str] = None
+) -> None:
+    """``resolved_from`` is the alias a trivially resolved merge is taken from."""
+    release_packages()
     # TODO: progressbar
     if mode == "merge":
         # Convert to LFS pointer only if one of the decendants is managed by LFS
-        if any(filedata_map[alias].is_lfs for alias in ["LOCAL", "REMOTE"]):
+        is_lfs = any(filedata_map[alias].is_lfs for alias in ["LOCAL", "REMOTE"])
+        source = filedata_map[resolved_from or "LOCAL"]
+        if resolved_from and not source.has_ext() and source.is_lfs == is_lfs:
+            # The untouched original already is the pointer (or blob) to write
+            if resolved_from == "LOCAL":
+                logger.debug("Keeping 'LOCAL'...")
+            else:
+                logger.debug("Copying '%s'...", resolved_from)
+                shutil.copy(source.name, filedata_map["LOCAL"].name)
+        elif is_lfs:
             logger.info("Converting LFS blob to pointer...")
             cmd = (
                 "cmd.exe /c 'type "
-                + str(filedata_map["LOCAL"].get_name())
+                + str(source.get_name())
                 + " | git-lfs clean > "
                 + str(filedata_map["LOCAL"].name)
                 + "'"
@@ -101,7 +128,7 @@ def postproc(filedata_map: Dict[str, object], mode: str) -> None:
             )
         else:
             logger.debug("Copying merged file...")
-            shutil.copy(filedata_map["LOCAL"].get_name(), filedata_map["LOCAL"].name)
+            shutil.copy(source.get_name(), filedata_map["LOCAL"].name)
         logger.debug("Done")
         # TODO: progressbar
 
@@ -0,0 +1,343 @@
+"""Similarity index of the Office documents in a repository.
+
+Documents are fingerprinted by a MinHash signature over word shingles of their text
+(one permutation hashing: each shingle is hashed once and the minimum is kept per
+bin). Signatures are stored by blob ID in ``.git/dmfo/index`` and only blobs that
+are not in the index yet are read. Queries use LSH banding, so only documents
+sharing at least one band with the query are compared; the band buckets are stored
+as a sorted table next to the index, so a query reads only the buckets it matches
+and their entries.
+"""
+from __future__ import annotations
+
+import bisect
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import sys
+import zipfile
+from array import array
+from pathlib import Path
+from typing import IO, Iterable, NamedTuple, Optional
+from xml.etree.ElementTree import ParseError  # nosec
+
+import dmfo.extract
+import dmfo.vcs
+from dmfo.ole import CompoundFileError
+from dmfo.ooxml.package import Source
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "index"
+MAGIC = b"DMFOIDX2"
+
+SHINGLE_SIZE = 5
+SIGNATURE_SIZE = 64
+BANDS = 16
+ROWS = SIGNATURE_SIZE // BANDS
+EMPTY = 0xFFFFFFFF
+# New entries are written after this many documents, so an aborted run keeps them
+SAVE_INTERVAL = 100
+
+# Blob ID length, blob ID (SHA-1 or SHA-256), path length
+ENTRY_HEAD = struct.Struct("<B32sH")
+SIGNATURE = struct.Struct(f"<{SIGNATURE_SIZE}I")
+
+BUCKETS_SUFFIX = ".buckets"
+# The arrays of the bucket table are read in place, so in native byte order
+BUCKETS_MAGIC = b"DMFOBK" + (b"LE" if sys.byteorder == "little" else b"BE")
+# End of the entries covered by the table, number of rows
+BUCKETS_HEAD = struct.Struct("<2Q")
+
+
+class Match(NamedTuple):
+    similarity: float
+    path: str
+    blob_id: str
+
+
+def signature(paragraphs: Iterable[str]) -> tuple[int, ...]:
+    words = " ".join(paragraphs).lower().split()
+    shingles = {
+        " ".join(words[idx : idx + SHINGLE_SIZE])
+        for idx in range(max(len(words) - SHINGLE_SIZE + 1, 1))
+    }
+    bins = [EMPTY] * SIGNATURE_SIZE
+    for shingle in shingles:
+        value = int.from_bytes(
+            hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little"
+        )
+        idx = value % SIGNATURE_SIZE
+        value = (value >> 32) & EMPTY
+        if value < bins[idx]:
+            bins[idx] = value
+    return tuple(bins)
+
+
+def similarity(sig_a: tuple[int, ...], sig_b: tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    bins = [(a, b) for a, b in zip(sig_a, sig_b) if a != EMPTY or b != EMPTY]
+    if not bins:
+        return 0.0
+    return sum(a == b for a, b in bins) / len(bins)
+
+
+def _read_entry(data: bytes, offset: int) -> tuple[str, str, tuple[int, ...], int]:
+    """Returns blob ID, path and signature of the entry at ``offset`` and the offset
+    of the next entry.
+    """
+    id_length, blob, length = ENTRY_HEAD.unpack_from(data, offset)
+    offset += ENTRY_HEAD.size
+    path = bytes(data[offset : offset + length]).decode("utf-8")
+    offset += length
+    sig = SIGNATURE.unpack_from(data, offset)
+    return blob[:id_length].hex(), path, sig, offset + SIGNATURE.size
+
+
+def band_keys(sig: tuple[int, ...]) -> list[int]:
+    """Returns a 64 bit hash of each band of a signature."""
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                struct.pack(f"<H{ROWS}I", band, *sig[band * ROWS : (band + 1) * ROWS]),
+                digest_size=8,
+            ).digest(),
+            "little",
+        )
+        for band in range(BANDS)
+    ]
+
+
+def _shares_band(sig_a: tuple[int, ...], sig_b: tuple[int, ...]) -> bool:
+    return any(
+        sig_a[band * ROWS : (band + 1) * ROWS] == sig_b[band * ROWS : (band + 1) * ROWS]
+        for band in range(BANDS)
+    )
+
+
+class Index:
+    """The index file holds the entries in the order they were added. Next to it,
+    the bucket table (``index.buckets``) holds one row per entry and band, sorted by
+    band hash: the keys and the entry offsets as two arrays, which queries
+    memory-map and search with ``bisect``. Entries appended after the table was
+    written are scanned by queries until the next update rewrites it.
+    """
+
+    def __init__(self, filename: Path):
+        self.filename = filename
+        self.buckets_filename = filename.with_name(filename.name + BUCKETS_SUFFIX)
+        self.entries: dict[str, tuple[str, tuple[int, ...]]] = {}
+        self.offsets: dict[str, int] = {}
+        self.pending: list[tuple[str, str, tuple[int, ...]]] = []
+        # End of the last complete entry in the file
+        self.size = 0
+        # Set if the file is outdated or damaged and has to be written anew
+        self.rewrite = False
+
+    def load(self) -> Index:
+        try:
+            data = self.filename.read_bytes()
+        except FileNotFoundError:
+            return self
+        if not data.startswith(MAGIC):
+            logger.warning("Rebuilding outdated or invalid index '%s'", self.filename)
+            self.rewrite = True
+            return self
+        offset = self.size = len(MAGIC)
+        try:
+            while offset < len(data):
+                blob_id, path, sig, next_offset = _read_entry(data, offset)
+                self.entries[blob_id] = (path, sig)
+                self.offsets[blob_id] = offset
+                offset = self.size = next_offset
+        except (struct.error, UnicodeDecodeError):
+            # Interrupted while appending, keep the complete entries
+            logger.warning("Repairing truncated index '%s'", self.filename)
+            self.rewrite = True
+        return self
+
+    def add(self, blob_id: str, path: str, sig: tuple[int, ...]) -> None:
+        self.entries[blob_id] = (path, sig)
+        self.pending.append((blob_id, path, sig))
+
+    def _write_entries(self, fileobj: IO[bytes], entries: Iterable[tuple]) -> None:
+        for blob_id, path, sig in entries:
+            self.offsets[blob_id] = fileobj.tell()
+            blob = bytes.fromhex(blob_id)
+            path_bytes = path.encode("utf-8")
+            fileobj.write(ENTRY_HEAD.pack(len(blob), blob, len(path_bytes)))
+            fileobj.write(path_bytes)
+            fileobj.write(SIGNATURE.pack(*sig))
+        self.size = fileobj.tell()
+
+    def save(self) -> None:
+        """Appends the entries added since loading to the index file, or writes all
+        entries to a new file if the old one could not be read completely. The
+        bucket table is rewritten if it does not cover all entries.
+        """
+        if self.rewrite:
+            tmp_filename = self.filename.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_filename, "wb") as fileobj:
+                fileobj.write(MAGIC)
+                self._write_entries(
+                    fileobj,
+                    ((blob_id, *entry) for blob_id, entry in self.entries.items()),
+                )
+            os.replace(tmp_filename, self.filename)
+            self.rewrite = False
+        elif self.pending:
+            with open(self.filename, "ab") as fileobj:
+                if fileobj.tell() == 0:
+                    fileobj.write(MAGIC)
+                self._write_entries(fileobj, self.pending)
+        self.pending.clear()
+        if self.size and self._covered() != self.size:
+            self._save_buckets()
+
+    def _covered(self) -> Optional[int]:
+        """Returns the end of the entries covered by the bucket table."""
+        try:
+            with open(self.buckets_filename, "rb") as fileobj:
+                head = fileobj.read(len(BUCKETS_MAGIC) + BUCKETS_HEAD.size)
+        except FileNotFoundError:
+            return None
+        if len(head) < len(BUCKETS_MAGIC) + BUCKETS_HEAD.size or not head.startswith(
+            BUCKETS_MAGIC
+        ):
+            return None
+        return BUCKETS_HEAD.unpack_from(head, len(BUCKETS_MAGIC))[0]
+
+    def _save_buckets(self) -> None:
+        logger.debug("Writing bucket table of %s entries", len(self.offsets))
+        rows = sorted(
+            (key, offset)
+            for blob_id, offset in self.offsets.items()
+            for key in band_keys(self.entries[blob_id][1])
+        )
+        keys = array("Q", (key for key, _ in rows))
+        offsets = array("Q", (offset for _, offset in rows))
+        tmp_filename = self.buckets_filename.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_filename, "wb") as fileobj:
+            fileobj.write(BUCKETS_MAGIC)
+            fileobj.write(BUCKETS_HEAD.pack(self.size, len(rows)))
+            keys.tofile(fileobj)
+            offsets.tofile(fileobj)
+        os.replace(tmp_filename, self.buckets_filename)
+
+    def _candidates(self, data: mmap.mmap, sig: tuple[int, ...]) -> tuple[set, int]:
+        """Returns the offsets of the entries sharing a band hash with ``sig`` and
+        the end of the entries covered by the bucket table.
+        """
+        candidates: set[int] = set()
+        try:
+            fileobj = open(self.buckets_filename, "rb")
+        except FileNotFoundError:
+            logger.debug("No bucket table, scanning all entries")
+            return candidates, len(MAGIC)
+        with fileobj, mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ) as table:
+            start = len(BUCKETS_MAGIC) + BUCKETS_HEAD.size
+            if not table[:start].startswith(BUCKETS_MAGIC):
+                logger.debug("Invalid bucket table, scanning all entries")
+                return candidates, len(MAGIC)
+            covered, count = BUCKETS_HEAD.unpack_from(table, len(BUCKETS_MAGIC))
+            if covered > len(data) or start + 16 * count > len(table):
+                logger.debug("Outdated bucket table, scanning all entries")
+                return candidates, len(MAGIC)
+            middle = start + 8 * count
+            with memoryview(table) as view:
+                keys = view[start:middle].cast("Q")
+                offsets = view[middle : middle + 8 * count].cast("Q")
+                try:
+                    for key in band_keys(sig):
+                        low = bisect.bisect_left(keys, key)
+                        high = bisect.bisect_right(keys, key, low)
+                        candidates.update(offsets[low:high])
+                finally:
+                    # The table cannot be unmapped while views are alive
+                    keys.release()
+                    offsets.release()
+        return candidates, covered
+
+    def query(self, sig: tuple[int, ...], max_results: int = 5) -> list[Match]:
+        """Returns the indexed documents sharing at least one band with ``sig``, most
+        similar first. Reads the matching rows of the bucket table and their entries
+        only, plus the entries appended after the table was written.
+        """
+        try:
+            fileobj = open(self.filename, "rb")
+        except FileNotFoundError:
+            return []
+        matches = {}
+        with fileobj:
+            if os.fstat(fileobj.fileno()).st_size <= len(MAGIC):
+                return []
+            with mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if data[: len(MAGIC)] != MAGIC:
+                    logger.warning("Outdated index '%s', update it", self.filename)
+                    return []
+                candidates, offset = self._candidates(data, sig)
+                try:
+                    # Entries not in the bucket table yet
+                    while offset < len(data):
+                        candidates.add(offset)
+                        offset = _read_entry(data, offset)[3]
+                except (struct.error, UnicodeDecodeError):
+                    logger.debug("Index ends with a truncated entry")
+                for offset in candidates:
+                    try:
+                        blob_id, path, entry_sig, _ = _read_entry(data, offset)
+                    except (struct.error, UnicodeDecodeError):
+                        continue
+                    if _shares_band(sig, entry_sig):
+                        matches[blob_id] = Match(
+                            similarity(sig, entry_sig), path, blob_id
+                        )
+        return sorted(matches.values(), reverse=True)[:max_results]
+
+
+def _read_paragraphs(source: Source, extension: str) -> Optional[list[str]]:
+    try:
+        return dmfo.extract.paragraphs(source, extension)
+    except (zipfile.BadZipFile, CompoundFileError, KeyError, ParseError) as exc:
+        logger.debug("Cannot extract text: '%s'", exc)
+    except Exception:  # A single broken document must not stop the indexing
+        logger.debug("Cannot extract text", exc_info=True)
+    return None
+
+
+def update() -> int:
+    index = Index(dmfo.vcs.dmfo_dir() / INDEX_NAME).load()
+    tracked = dmfo.vcs.ls_files(dmfo.extract.EXTRACTORS)
+    paths = {}
+    for path, blob_id in tracked.items():
+        if blob_id not in index.entries:
+            paths.setdefault(blob_id, path)
+    logger.info("Indexing %s of %s documents...", len(paths), len(tracked))
+
+    try:
+        for blob_id, data in dmfo.vcs.cat_blobs(paths):
+            path = paths[blob_id]
+            paragraphs = _read_paragraphs(data, Path(path).suffix)
+            if paragraphs is None:
+                logger.warning("Skipping '%s'", path)
+                continue
+            index.add(blob_id, path, signature(paragraphs))
+            if len(index.pending) >= SAVE_INTERVAL:
+                index.save()
+    finally:
+        index.save()
+    logger.info("Done.")
+    return 0
+
+
+def query(filename: Path, max_results: int = 5) -> int:
+    index = Index(dmfo.vcs.dmfo_dir() / INDEX_NAME)
+    paragraphs = _read_paragraphs(filename, filename.suffix)
+    if paragraphs is None:
+        logger.critical("Cannot read '%s'", filename)
+        return 2
+    for match in index.query(signature(paragraphs), max_results=max_results):
+        sys.stdout.write(f"{match.similarity:4.0%} {match.path} ({match.blob_id})\n")
+    return 0
@@ -0,0 +1,236 @@
+"""Log file shared by concurrently running DMFO processes.
+
+Git starts one driver process per file, so each process buffers its records and
+appends them to a single rotating log file in one write, holding an inter-process
+lock while writing and rotating. The log directory is private to the user, as the
+temp dir may be shared by all users on POSIX systems.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import time
+from collections import deque
+from pathlib import Path
+from typing import IO
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+logger = logging.getLogger(__name__)
+
+if sys.platform == "win32":
+    LOG_DIR = Path(tempfile.gettempdir()) / "dmfo"  # Already per user
+else:
+    LOG_DIR = Path(tempfile.gettempdir()) / f"dmfo-{os.getuid()}"
+
+# Stale per-process temp dirs ("dmfo_*") are removed when older than STALE_AGE or,
+# oldest first, while all of them together exceed STALE_SIZE
+STALE_AGE = 7 * 24 * 60 * 60
+STALE_SIZE = 100 * 1024 * 1024
+CLEANUP_INTERVAL = 24 * 60 * 60
+
+
+def private_dir(path: Path) -> Path:
+    """Creates ``path`` accessible by the current user only. Raises
+    ``PermissionError`` if it exists but is not a directory owned by the user (e.g.
+    planted by another user).
+    """
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if sys.platform != "win32":
+        info = os.lstat(path)
+        if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+            raise PermissionError(f"'{path}' is not a directory owned by the user")
+        if info.st_mode & 0o077:
+            os.chmod(path, 0o700)
+    return path
+
+
+def _open(filename: Path, mode: str) -> IO:
+    """Opens ``filename`` for appending ("ab") or locking ("a+b") without following
+    symlinks.
+    """
+    flags = os.O_CREAT | os.O_APPEND | getattr(os, "O_NOFOLLOW", 0)
+    flags |= os.O_RDWR if "+" in mode else os.O_WRONLY
+    return os.fdopen(os.open(filename, flags, 0o600), mode)
+
+
+def _lock(fileobj: IO) -> None:
+    if sys.platform == "win32":
+        fileobj.seek(0)
+        msvcrt.locking(fileobj.fileno(), msvcrt.LK_LOCK, 1)
+    else:
+        fcntl.flock(fileobj.fileno(), fcntl.LOCK_EX)
+
+
+def _unlock(fileobj: IO) -> None:
+    if sys.platform == "win32":
+        fileobj.seek(0)
+        msvcrt.locking(fileobj.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(fileobj.fileno(), fcntl.LOCK_UN)
+
+
+class SharedFileHandler(logging.Handler):
+    """Buffers formatted records and appends them to ``filename`` on flush (when a
+    record of ``flush_level`` or above is emitted, or on close). At most
+    ``capacity`` records are buffered, older ones are dropped (and counted), so a
+    long run that ends in ``discard()`` never reaches the file. The file is rotated
+    like ``RotatingFileHandler`` once it would exceed ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        filename: Path,
+        max_bytes: int = 1024 * 1024,
+        backup_count: int = 9,
+        capacity: int = 1000,
+        flush_level: int = logging.ERROR,
+    ):
+        super().__init__()
+        self.filename = Path(filename)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.capacity = capacity
+        self.flush_level = flush_level
+        self.buffer: deque[str] = deque(maxlen=capacity)
+        self.dropped = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            line = self.format(record) + "\n"
+        except Exception:
+            self.handleError(record)
+            return
+        with self.lock:
+            if len(self.buffer) == self.capacity:
+                self.dropped += 1
+            self.buffer.append(line)
+        if record.levelno >= self.flush_level:
+            self.flush()
+
+    def discard(self) -> None:
+        """Drops all buffered records."""
+        with self.lock:
+            self.buffer.clear()
+            self.dropped = 0
+
+    def flush(self) -> None:
+        with self.lock:
+            if not self.buffer:
+                return
+            lines = list(self.buffer)
+            if self.dropped:
+                lines.insert(
+                    0,
+                    f"[{self.dropped} earlier records dropped, buffer of "
+                    f"{self.capacity} records was full]\n",
+                )
+            data = "".join(lines).encode("utf-8")
+            self.buffer.clear()
+            self.dropped = 0
+            try:
+                private_dir(self.filename.parent)
+                with _open(Path(f"{self.filename}.lock"), "a+b") as lockfile:
+                    _lock(lockfile)
+                    try:
+                        self._write(data)
+                    finally:
+                        _unlock(lockfile)
+            except OSError:
+                self.handleError(None)
+
+    def _write(self, data: bytes) -> None:
+        try:
+            size = self.filename.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size and size + len(data) > self.max_bytes:
+            self._rotate()
+        with _open(self.filename, "ab") as fileobj:
+            fileobj.write(data)
+
+    def _rotate(self) -> None:
+        for idx in range(self.backup_count - 1, 0, -1):
+            source = Path(f"{self.filename}.{idx}")
+            if source.exists():
+                os.replace(source, f"{self.filename}.{idx + 1}")
+        if self.backup_count:
+            os.replace(self.filename, f"{self.filename}.1")
+        else:
+            self.filename.unlink()
+
+    def close(self) -> None:
+        self.flush()
+        super().close()
+
+
+def _dir_size(path: Path) -> int:
+    size = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return size
+
+
+def cleanup_temp_dirs(
+    temp_dir: Path = Path(tempfile.gettempdir()),
+    max_age: float = STALE_AGE,
+    max_size: int = STALE_SIZE,
+) -> int:
+    """Removes stale ``dmfo_*`` directories from ``temp_dir``, at most once per
+    ``CLEANUP_INTERVAL``. Returns the number of removed directories. Errors are
+    logged only, housekeeping must never fail a driver run.
+    """
+    try:
+        return _cleanup_temp_dirs(temp_dir, max_age, max_size)
+    except OSError as exc:
+        logger.debug("Cleanup of temp dirs failed: '%s'", exc)
+        return 0
+
+
+def _cleanup_temp_dirs(temp_dir: Path, max_age: float, max_size: int) -> int:
+    stamp = LOG_DIR / "cleanup.stamp"
+    now = time.time()
+    try:
+        if now - stamp.stat().st_mtime < CLEANUP_INTERVAL:
+            return 0
+    except FileNotFoundError:
+        pass
+    private_dir(LOG_DIR)
+    stamp.touch()
+
+    stale = []
+    with os.scandir(temp_dir) as entries:
+        for entry in entries:
+            if not entry.name.startswith("dmfo_"):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stale.append((entry.stat().st_mtime, Path(entry.path)))
+            except FileNotFoundError:  # Removed by a concurrent cleanup
+                continue
+    stale.sort()
+
+    remove = [path for mtime, path in stale if now - mtime > max_age]
+    kept = [(path, _dir_size(path)) for mtime, path in stale if now - mtime <= max_age]
+    total = sum(size for _, size in kept)
+    for path, size in kept:
+        if total <= max_size:
+            break
+        remove.append(path)
+        total -= size
+
+    for path in remove:
+        logger.debug("Removing stale temp dir '%s'", path)
+        shutil.rmtree(path, ignore_errors=True)
+    return len(remove)
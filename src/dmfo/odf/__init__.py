@@ -0,0 +1,4 @@
+from .content import iter_units, read_units
+from .merge import merge_packages, merge_part, split_units
+
+EXTENSIONS = [".odt", ".odp", ".ods"]
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from typing import IO, Iterator
+from xml.etree import ElementTree  # nosec
+
+from dmfo.ooxml.package import Source, open_package
+
+OFFICE_NS = "urn:oasis:names:tc:opendocument:xmlns:office:1.0"
+TEXT_NS = "urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+TABLE_NS = "urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+PRESENTATION_NS = "urn:oasis:names:tc:opendocument:xmlns:presentation:1.0"
+
+TEXT_P = f"{{{TEXT_NS}}}p"
+TEXT_H = f"{{{TEXT_NS}}}h"
+TEXT_S = f"{{{TEXT_NS}}}s"
+TEXT_C = f"{{{TEXT_NS}}}c"
+TEXT_TAB = f"{{{TEXT_NS}}}tab"
+TEXT_LINE_BREAK = f"{{{TEXT_NS}}}line-break"
+TABLE_ROW = f"{{{TABLE_NS}}}table-row"
+TABLE_CELL = f"{{{TABLE_NS}}}table-cell"
+TABLE_COVERED_CELL = f"{{{TABLE_NS}}}covered-table-cell"
+TABLE_ROWS_REPEATED = f"{{{TABLE_NS}}}number-rows-repeated"
+TABLE_COLUMNS_REPEATED = f"{{{TABLE_NS}}}number-columns-repeated"
+OFFICE_SPREADSHEET = f"{{{OFFICE_NS}}}spreadsheet"
+
+PARAGRAPH_TAGS = {TEXT_P, TEXT_H}
+CELL_TAGS = {TABLE_CELL, TABLE_COVERED_CELL}
+# Text that is not part of the document body
+SKIPPED_TAGS = {
+    f"{{{OFFICE_NS}}}annotation",
+    f"{{{TEXT_NS}}}tracked-changes",
+    f"{{{PRESENTATION_NS}}}notes",
+}
+
+CONTENT_PART = "content.xml"
+
+
+def _text(elem: ElementTree.Element) -> str:
+    """Returns the text of a paragraph, without nested paragraphs (of notes, text
+    boxes, ...) and skipped elements.
+    """
+    parts = [elem.text or ""]
+    for child in elem:
+        if child.tag == TEXT_S:
+            parts.append(" " * int(child.get(TEXT_C, "1")))
+        elif child.tag == TEXT_TAB:
+            parts.append("\t")
+        elif child.tag == TEXT_LINE_BREAK:
+            parts.append("\n")
+        elif child.tag not in PARAGRAPH_TAGS and child.tag not in SKIPPED_TAGS:
+            parts.append(_text(child))
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+
+def iter_units(stream: IO[bytes]) -> Iterator[str]:
+    """Streams the text units of an ODF content part in document order: paragraphs
+    and headings of text documents and presentations, rows (tab separated cells) of
+    spreadsheets. Processed elements are removed from the tree right away, so memory
+    use does not grow with the document size.
+    """
+    stack: list[ElementTree.Element] = []
+    paragraphs = 0  # Open paragraphs
+    skipped = 0  # Open skipped elements
+    spreadsheet = False
+    cells = None  # (text, repeat) of the open spreadsheet row
+    cell = None  # Paragraphs of the open spreadsheet cell
+    for event, elem in ElementTree.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            stack.append(elem)
+            if elem.tag in PARAGRAPH_TAGS:
+                paragraphs += 1
+            elif elem.tag in SKIPPED_TAGS:
+                skipped += 1
+            elif elem.tag == OFFICE_SPREADSHEET:
+                spreadsheet = True
+            elif spreadsheet and elem.tag == TABLE_ROW:
+                cells = []
+            elif cells is not None and elem.tag in CELL_TAGS:
+                cell = []
+            continue
+
+        stack.pop()
+        if elem.tag in PARAGRAPH_TAGS:
+            paragraphs -= 1
+            if skipped:
+                pass
+            elif cell is not None:
+                if not paragraphs:
+                    cell.append(_text(elem))
+            else:
+                yield _text(elem)
+        elif elem.tag in SKIPPED_TAGS:
+            skipped -= 1
+        elif elem.tag in CELL_TAGS and cell is not None:
+            repeat = int(elem.get(TABLE_COLUMNS_REPEATED, "1"))
+            cells.append(("\n".join(cell), repeat))
+            cell = None
+        elif elem.tag == TABLE_ROW and cells is not None:
+            # Formatted but empty cells and rows are repeated up to the sheet size
+            while cells and not cells[-1][0]:
+                cells.pop()
+            if cells:
+                row = "\t".join(text for text, repeat in cells for _ in range(repeat))
+                for _ in range(int(elem.get(TABLE_ROWS_REPEATED, "1"))):
+                    yield row
+            cells = None
+
+        if not paragraphs and stack:
+            # Every element still in the tree is open, so this is the last child
+            del stack[-1][-1]
+
+
+def read_units(source: Source) -> list[str]:
+    """Returns the text units of a .odt, .odp or .ods file."""
+    with open_package(source).open(CONTENT_PART) as stream:
+        return list(iter_units(stream))
@@ -0,0 +1,203 @@
+"""Three-way merge of ODF packages.
+
+Parts changed on one side only are taken from that side (compared by the CRC in
+the central directory). The XML parts holding the document body, styles and
+manifest are split into units (the children of container elements: paragraphs,
+tables, slides, sheet rows, styles, manifest entries) and merged unit-wise, so
+edits in different paragraphs, slides or rows merge cleanly. The units are slices
+of the original XML, unchanged units are written back byte for byte.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import zipfile
+from typing import IO, Optional, Union
+from xml.parsers import expat  # nosec
+
+from dmfo.compare import merge3
+from dmfo.odf.content import OFFICE_NS, TABLE_NS
+from dmfo.ooxml.package import Package, Source, open_package
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NS = "urn:oasis:names:tc:opendocument:xmlns:manifest:1.0"
+
+# Elements whose children are merged as separate units
+CONTAINER_TAGS = {
+    f"{OFFICE_NS} {tag}"
+    for tag in [
+        "font-face-decls",
+        "styles",
+        "automatic-styles",
+        "master-styles",
+        "text",
+        "presentation",
+        "spreadsheet",
+        "drawing",
+    ]
+} | {f"{TABLE_NS} table", f"{MANIFEST_NS} manifest"}
+
+MIMETYPE_PART = "mimetype"
+MANIFEST_PART = "META-INF/manifest.xml"
+MERGED_PARTS = ("content.xml", "styles.xml", MANIFEST_PART)
+# Parts rewritten on every save, taken from LOCAL if both sides changed them
+LOCAL_PARTS = ("meta.xml", "settings.xml", "Thumbnails/thumbnail.png")
+
+# Automatic style names (P1, T2, ...) are reassigned on every save
+STYLE_DEF_RE = re.compile(rb'<[^>]*?\sstyle:name="([^"]*)"')
+STYLE_REF_RE = re.compile(rb'style-name="([^"]*)"')
+FULL_PATH_RE = re.compile(rb'full-path="([^"]*)"')
+
+
+def split_units(data: bytes) -> list[bytes]:
+    """Splits an XML part at the children of container elements. The end tag of a
+    container starts a unit of its own. Joining the units gives the part again.
+    """
+    cuts = [0]
+    is_container: list[bool] = []
+    parser = expat.ParserCreate(namespace_separator=" ")
+
+    def start_element(name: str, attrs: dict[str, str]) -> None:
+        if is_container and is_container[-1]:
+            cuts.append(parser.CurrentByteIndex)
+        is_container.append(name in CONTAINER_TAGS)
+
+    def end_element(name: str) -> None:
+        if is_container.pop():
+            cuts.append(parser.CurrentByteIndex)
+
+    parser.StartElementHandler = start_element
+    parser.EndElementHandler = end_element
+    parser.Parse(data, True)
+    cuts.append(len(data))
+    return [data[start:end] for start, end in zip(cuts, cuts[1:]) if end > start]
+
+
+def _style_defs(units: list[bytes]) -> dict[bytes, bytes]:
+    return {
+        match.group(1): unit
+        for unit in units
+        if (match := STYLE_DEF_RE.match(unit)) is not None
+    }
+
+
+def _styles_consistent(merged: list[bytes], sides: list[list[bytes]]) -> bool:
+    """Checks that units taken from one side reference the same style definitions
+    in the merged part as on their side.
+    """
+    merged_units = set(merged)
+    merged_defs = _style_defs(merged)
+    base_units = set(sides[0])
+    for units in sides[1:]:
+        defs = _style_defs(units)
+        for unit in set(units) & merged_units - base_units:
+            for name in STYLE_REF_RE.findall(unit):
+                if name in defs and merged_defs.get(name) != defs[name]:
+                    logger.debug("Style '%s' differs in merge", name.decode())
+                    return False
+    return True
+
+
+def _merge_manifest(
+    base: list[bytes], local: list[bytes], remote: list[bytes]
+) -> tuple[list, int]:
+    """Merges the manifest entries as sets, their order does not matter. Entries of
+    the same part changed on both sides conflict.
+    """
+    removed = set(base) - set(remote)
+    added = [unit for unit in remote if unit not in base and unit not in local]
+    merged = [unit for unit in local[:-1] if unit not in removed] + added + local[-1:]
+    paths = [path for unit in merged for path in FULL_PATH_RE.findall(unit)]
+    return merged, len(paths) - len(set(paths))
+
+
+def merge_part(
+    base: bytes, local: bytes, remote: bytes, unordered: bool = False
+) -> Optional[bytes]:
+    """Merges an XML part unit-wise, returns None on conflicts. The units of
+    ``unordered`` parts are merged as sets.
+    """
+    try:
+        sides = [split_units(data) for data in (base, local, remote)]
+    except expat.ExpatError as exc:
+        logger.debug("Cannot parse part: '%s'", exc)
+        return None
+    merged, conflicts = (_merge_manifest if unordered else merge3)(*sides)
+    if conflicts:
+        logger.debug("%s conflicting units", conflicts)
+        return None
+    if not _styles_consistent(merged, sides):
+        return None
+    data = b"".join(merged)
+    try:
+        # Unit changes next to container boundaries may unbalance the tags
+        expat.ParserCreate().Parse(data, True)
+    except expat.ExpatError as exc:
+        logger.debug("Merge is not well-formed: '%s'", exc)
+        return None
+    return data
+
+
+def merge_packages(
+    base_source: Optional[Source],
+    local_source: Source,
+    remote_source: Source,
+    fileobj: IO,
+) -> list[str]:
+    """Merges three ODF packages into ``fileobj``. Without ``base_source`` (added on
+    both sides) every part is new on both sides. Returns the names of the parts
+    with conflicting changes, nothing is written if there are any.
+    """
+    local, remote = (open_package(source) for source in (local_source, remote_source))
+    base = None if base_source is None else open_package(base_source)
+    base_index = {} if base is None else base.index()
+    local_index, remote_index = local.index(), remote.index()
+
+    # Part name -> package to copy it from, or merged content
+    parts: dict[str, Union[Package, bytes]] = {}
+    conflicts = []
+    for name in dict.fromkeys([*local_index, *remote_index]):
+        base_info = base_index.get(name)
+        local_info = local_index.get(name)
+        remote_info = remote_index.get(name)
+        if local_info == remote_info or remote_info == base_info:
+            parts[name] = local
+        elif local_info == base_info:
+            parts[name] = remote
+        elif name in LOCAL_PARTS:
+            parts[name] = local
+        elif name in MERGED_PARTS and None not in (base_info, local_info, remote_info):
+            logger.debug("Merging part '%s'", name)
+            data = merge_part(
+                base.read(name),
+                local.read(name),
+                remote.read(name),
+                unordered=name == MANIFEST_PART,
+            )
+            if data is None:
+                conflicts.append(name)
+            parts[name] = data
+        else:
+            conflicts.append(name)
+    if conflicts:
+        return conflicts
+
+    # Parts deleted on one side and unchanged on the other are dropped
+    parts = {
+        name: source
+        for name, source in parts.items()
+        if not isinstance(source, Package) or name in source.parts
+    }
+    with zipfile.ZipFile(fileobj, "w", zipfile.ZIP_DEFLATED) as archive:
+        # The mimetype must be the first part and stored uncompressed
+        if MIMETYPE_PART in parts:
+            archive.writestr(
+                MIMETYPE_PART,
+                parts.pop(MIMETYPE_PART).read(MIMETYPE_PART),
+                zipfile.ZIP_STORED,
+            )
+        for name, source in parts.items():
+            data = source if isinstance(source, bytes) else source.read(name)
+            archive.writestr(name, data)
+    return []
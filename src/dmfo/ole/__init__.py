@@ -0,0 +1,3 @@
+from .compound import CompoundFile, CompoundFileError, is_compound_file
+from .powerpoint import read_ppt_paragraphs
+from .word import read_doc_paragraphs
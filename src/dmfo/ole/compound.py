@@ -0,0 +1,268 @@
+"""Reader for OLE2 compound files (legacy .doc/.ppt/.xls).
+
+The file is memory-mapped and only the FAT, the directory and the mini FAT are read
+up front. Streams are read sector by sector along their chains, so random access
+into a large stream only touches the sectors needed.
+"""
+from __future__ import annotations
+
+import io
+import mmap
+import struct
+from array import array
+from pathlib import Path
+from typing import NamedTuple, Union
+
+SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+HEADER = struct.Struct("<8s16s8H9L")
+DIFAT_OFFSET = 0x4C
+HEADER_DIFAT_SIZE = 109
+DIR_ENTRY = struct.Struct("<64sHBB3L16sL2QLQ")
+DIR_ENTRY_SIZE = 128
+MAXREGSECT = 0xFFFFFFFA
+NOSTREAM = 0xFFFFFFFF
+STREAM = 2
+ROOT = 5
+
+Source = Union[Path, bytes]
+
+
+class CompoundFileError(ValueError):
+    pass
+
+
+class DirEntry(NamedTuple):
+    name: str
+    entry_type: int
+    left: int
+    right: int
+    child: int
+    start: int
+    size: int
+
+
+def is_compound_file(filename: Path) -> bool:
+    with open(filename, "rb") as fileobj:
+        return fileobj.read(len(SIGNATURE)) == SIGNATURE
+
+
+class Stream(io.RawIOBase):
+    """Seekable stream following a sector chain of ``buffer``."""
+
+    def __init__(
+        self, buffer: memoryview, sectors: list[int], sector_size: int, size: int
+    ):
+        self.buffer = buffer
+        self.sectors = sectors
+        self.sector_size = sector_size
+        self.size = size
+        self.pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self.pos = max(offset, 0)
+        return self.pos
+
+    def tell(self) -> int:
+        return self.pos
+
+    def readinto(self, buffer) -> int:
+        written = 0
+        want = min(len(buffer), max(self.size - self.pos, 0))
+        while written < want:
+            idx, offset = divmod(self.pos, self.sector_size)
+            if idx >= len(self.sectors):
+                raise CompoundFileError("Stream is longer than its sector chain")
+            start = self.sectors[idx] + offset
+            size = min(self.sector_size - offset, want - written)
+            if start + size > len(self.buffer):
+                raise CompoundFileError("Sector out of bounds")
+            buffer[written : written + size] = self.buffer[start : start + size]
+            written += size
+            self.pos += size
+        return written
+
+    def read_at(self, offset: int, size: int) -> bytes:
+        self.seek(offset)
+        # Sizes read from a corrupt file may be negative or huge
+        data = bytearray(min(max(size, 0), max(self.size - self.pos, 0)))
+        return bytes(data[: self.readinto(data)])
+
+
+class CompoundFile:
+    def __init__(self, source: Source):
+        self._mmap = None
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self.buffer = memoryview(source)
+        else:
+            with open(source, "rb") as fileobj:
+                try:
+                    self._mmap = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:  # Empty file
+                    raise CompoundFileError("File is empty") from None
+            self.buffer = memoryview(self._mmap)
+        try:
+            self._read_header()
+            self.entries = self._read_directory()
+        except (struct.error, IndexError) as exc:
+            self.close()
+            raise CompoundFileError(f"Invalid compound file: {exc}") from None
+        except CompoundFileError:
+            self.close()
+            raise
+
+    def __enter__(self) -> CompoundFile:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.buffer.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def _read_header(self) -> None:
+        fields = HEADER.unpack_from(self.buffer, 0)
+        if fields[0] != SIGNATURE:
+            raise CompoundFileError("File is not a compound file")
+        if fields[5] not in (9, 12) or fields[6] != 6:
+            raise CompoundFileError("Invalid sector size")
+        self.sector_size = 1 << fields[5]
+        self.mini_sector_size = 1 << fields[6]
+        num_fat, first_dir = fields[11], fields[12]
+        self.mini_cutoff = fields[14]
+        first_mini_fat, num_mini_fat = fields[15], fields[16]
+        first_difat, num_difat = fields[17], fields[18]
+
+        fat_sectors = list(
+            struct.unpack_from(f"<{HEADER_DIFAT_SIZE}L", self.buffer, DIFAT_OFFSET)
+        )
+        per_sector = self.sector_size // 4 - 1
+        sid = first_difat
+        for _ in range(num_difat):
+            if sid > MAXREGSECT:
+                break
+            offset = self._offset(sid)
+            fat_sectors.extend(
+                struct.unpack_from(f"<{per_sector}L", self.buffer, offset)
+            )
+            (sid,) = struct.unpack_from("<L", self.buffer, offset + per_sector * 4)
+        self.fat = array("I")
+        for sid in fat_sectors[:num_fat]:
+            self.fat.frombytes(self._sector(sid))
+
+        self.mini_fat = array("I")
+        if num_mini_fat:
+            for sid in self._chain(first_mini_fat):
+                self.mini_fat.frombytes(self._sector(sid))
+        self.first_dir = first_dir
+
+    def _offset(self, sid: int) -> int:
+        return (sid + 1) * self.sector_size
+
+    def _sector(self, sid: int) -> memoryview:
+        offset = self._offset(sid)
+        if offset + self.sector_size > len(self.buffer):
+            raise CompoundFileError(f"Sector {sid} out of bounds")
+        return self.buffer[offset : offset + self.sector_size]
+
+    def _chain(self, start: int, fat: array = None) -> list[int]:
+        fat = self.fat if fat is None else fat
+        chain = []
+        sid = start
+        while sid <= MAXREGSECT:
+            if sid >= len(fat) or len(chain) >= len(fat):
+                raise CompoundFileError("Invalid sector chain")
+            chain.append(sid)
+            sid = fat[sid]
+        return chain
+
+    def _read_directory(self) -> list[DirEntry]:
+        entries = []
+        for sid in self._chain(self.first_dir):
+            offset = self._offset(sid)
+            for idx in range(self.sector_size // DIR_ENTRY_SIZE):
+                fields = DIR_ENTRY.unpack_from(
+                    self.buffer, offset + idx * DIR_ENTRY_SIZE
+                )
+                name_len = max(fields[1] - 2, 0)
+                entries.append(
+                    DirEntry(
+                        name=fields[0][:name_len].decode("utf-16-le", "replace"),
+                        entry_type=fields[2],
+                        left=fields[4],
+                        right=fields[5],
+                        child=fields[6],
+                        start=fields[11],
+                        # Version 3 files may have garbage in the upper 32 bits
+                        size=fields[12]
+                        if self.sector_size > 512
+                        else fields[12] & 0xFFFFFFFF,
+                    )
+                )
+        if not entries or entries[0].entry_type != ROOT:
+            raise CompoundFileError("Missing root entry")
+        root = entries[0]
+        self.mini_stream = Stream(
+            self.buffer,
+            [self._offset(sid) for sid in self._chain(root.start)],
+            self.sector_size,
+            root.size,
+        )
+        return entries
+
+    def listdir(self, storage: int = 0) -> dict[str, int]:
+        """Returns ``{name: entry index}`` of the children of a storage."""
+        children = {}
+        stack = [self.entries[storage].child]
+        while stack:
+            idx = stack.pop()
+            if idx == NOSTREAM or idx >= len(self.entries):
+                continue
+            entry = self.entries[idx]
+            if entry.name in children:
+                raise CompoundFileError("Directory tree contains a loop")
+            children[entry.name] = idx
+            stack.extend((entry.left, entry.right))
+        return children
+
+    def exists(self, name: str) -> bool:
+        return name in self.listdir()
+
+    def open(self, name: str) -> Stream:
+        """Returns a seekable stream of a top level stream."""
+        try:
+            entry = self.entries[self.listdir()[name]]
+        except KeyError:
+            raise KeyError(f"No stream named '{name}'") from None
+        if entry.entry_type != STREAM:
+            raise CompoundFileError(f"'{name}' is not a stream")
+        if entry.size < self.mini_cutoff:
+            # Mini streams are chains of mini sectors within the root's mini stream
+            sectors = [
+                sid * self.mini_sector_size
+                for sid in self._chain(entry.start, self.mini_fat)
+            ]
+            data = bytearray(len(sectors) * self.mini_sector_size)
+            for idx, offset in enumerate(sectors):
+                start = idx * self.mini_sector_size
+                chunk = self.mini_stream.read_at(offset, self.mini_sector_size)
+                data[start : start + len(chunk)] = chunk
+            return Stream(memoryview(bytes(data)), [0], len(data), entry.size)
+        return Stream(
+            self.buffer,
+            [self._offset(sid) for sid in self._chain(entry.start)],
+            self.sector_size,
+            entry.size,
+        )
@@ -0,0 +1,137 @@
+"""Text of PowerPoint 97-2003 (.ppt) files.
+
+The ``PowerPoint Document`` stream is a tree of records. Saved edits are appended
+to the stream, so the live records are looked up through the persist directory of
+the current edit instead of scanning the stream front to back. Slide text is
+stored in the document's slide list (placeholders) and in the text boxes of the
+slide records.
+"""
+from __future__ import annotations
+
+import struct
+from typing import Iterator
+
+from dmfo.ole.compound import CompoundFile, CompoundFileError, Source, Stream
+
+DOCUMENT_STREAM = "PowerPoint Document"
+CURRENT_USER_STREAM = "Current User"
+RECORD_HEADER = struct.Struct("<2HL")
+CONTAINER_VERSION = 0xF
+
+RT_DOCUMENT = 0x03E8
+RT_SLIDE = 0x03EE
+RT_SLIDE_PERSIST_ATOM = 0x03F3
+RT_TEXT_CHARS_ATOM = 0x0FA0
+RT_TEXT_BYTES_ATOM = 0x0FA8
+RT_SLIDE_LIST_WITH_TEXT = 0x0FF0
+RT_USER_EDIT_ATOM = 0x0FF5
+RT_PERSIST_DIRECTORY_ATOM = 0x1772
+SLIDE_LIST_SLIDES = 0  # Instance of the slide list holding the slides
+CURRENT_EDIT_OFFSET = 16
+
+LINE_BREAKS = str.maketrans({"\x0b": "\n"})
+
+
+def _records(data: bytes, offset: int = 0, end: int = None) -> Iterator[tuple]:
+    """Yields ``(type, instance, is_container, body offset, body length)`` of the
+    records in ``data[offset:end]``, descending into containers.
+    """
+    end = len(data) if end is None else end
+    while offset + RECORD_HEADER.size <= end:
+        ver_instance, rec_type, length = RECORD_HEADER.unpack_from(data, offset)
+        offset += RECORD_HEADER.size
+        is_container = ver_instance & 0xF == CONTAINER_VERSION
+        yield rec_type, ver_instance >> 4, is_container, offset, length
+        if not is_container:
+            offset += length
+
+
+def _record(stream: Stream, offset: int, rec_type: int) -> bytes:
+    """Returns a whole record (header and body) at ``offset`` of the stream."""
+    header = stream.read_at(offset, RECORD_HEADER.size)
+    if len(header) < RECORD_HEADER.size:
+        raise CompoundFileError(f"Record at {offset} out of bounds")
+    _, found_type, length = RECORD_HEADER.unpack(header)
+    if found_type != rec_type:
+        raise CompoundFileError(f"Expected record {rec_type:#x} at {offset}")
+    return header + stream.read_at(offset + RECORD_HEADER.size, length)
+
+
+def _text(data: bytes, rec_type: int, offset: int, length: int) -> list[str]:
+    chunk = data[offset : offset + length]
+    if rec_type == RT_TEXT_CHARS_ATOM:
+        text = chunk.decode("utf-16-le", "replace")
+    else:
+        text = chunk.decode("latin-1")
+    return text.translate(LINE_BREAKS).split("\r")
+
+
+def _persist_directory(ole: CompoundFile, stream: Stream) -> tuple[dict, int]:
+    """Returns ``{persist id: stream offset}`` and the document's persist id."""
+    current_user = ole.open(CURRENT_USER_STREAM).read_at(CURRENT_EDIT_OFFSET, 4)
+    (edit_offset,) = struct.unpack("<L", current_user)
+    directory: dict[int, int] = {}
+    document_ref = None
+    seen = set()
+    while edit_offset and edit_offset not in seen:
+        seen.add(edit_offset)
+        edit = _record(stream, edit_offset, RT_USER_EDIT_ATOM)
+        last_edit, directory_offset, doc_ref = struct.unpack_from("<3L", edit, 16)
+        if document_ref is None:
+            document_ref = doc_ref
+        entries = _record(stream, directory_offset, RT_PERSIST_DIRECTORY_ATOM)
+        offset = RECORD_HEADER.size
+        while offset + 4 <= len(entries):
+            (value,) = struct.unpack_from("<L", entries, offset)
+            persist_id, count = value & 0xFFFFF, value >> 20
+            offsets = struct.unpack_from(f"<{count}L", entries, offset + 4)
+            for idx, persist_offset in enumerate(offsets):
+                # Newer edits come first and take precedence
+                directory.setdefault(persist_id + idx, persist_offset)
+            offset += 4 + 4 * count
+        edit_offset = last_edit
+    if document_ref not in directory:
+        raise CompoundFileError("Document record not found")
+    return directory, document_ref
+
+
+def read_ppt_paragraphs(source: Source) -> list[str]:
+    """Returns the text paragraphs of a .ppt file in slide order."""
+    with CompoundFile(source) as ole:
+        try:
+            return _read_paragraphs(ole)
+        except (struct.error, IndexError) as exc:
+            raise CompoundFileError(f"Invalid PowerPoint file: {exc}") from None
+
+
+def _read_paragraphs(ole: CompoundFile) -> list[str]:
+    stream = ole.open(DOCUMENT_STREAM)
+    directory, document_ref = _persist_directory(ole, stream)
+    document = _record(stream, directory[document_ref], RT_DOCUMENT)
+
+    # Placeholder text per slide from the slide list, in slide order
+    slides: list[tuple[int, list[str]]] = []
+    slide_list_end = -1
+    for rec_type, instance, _, offset, length in _records(document):
+        if rec_type == RT_SLIDE_LIST_WITH_TEXT:
+            if instance == SLIDE_LIST_SLIDES:
+                slide_list_end = offset + length
+        elif offset >= slide_list_end:
+            continue
+        elif rec_type == RT_SLIDE_PERSIST_ATOM:
+            (persist_ref,) = struct.unpack_from("<L", document, offset)
+            slides.append((persist_ref, []))
+        elif rec_type in (RT_TEXT_CHARS_ATOM, RT_TEXT_BYTES_ATOM) and slides:
+            slides[-1][1].extend(_text(document, rec_type, offset, length))
+
+    paragraphs = []
+    for persist_ref, texts in slides:
+        paragraphs.extend(texts)
+        if persist_ref not in directory:
+            continue
+        # Text of other shapes is stored in the slide's drawing
+        slide = _record(stream, directory[persist_ref], RT_SLIDE)
+        for rec_type, _, _, offset, length in _records(slide):
+            if rec_type in (RT_TEXT_CHARS_ATOM, RT_TEXT_BYTES_ATOM):
+                paragraphs.extend(_text(slide, rec_type, offset, length))
+    return paragraphs
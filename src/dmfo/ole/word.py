@@ -0,0 +1,127 @@
+"""Text of Word 97-2003 (.doc) files.
+
+The text is located through the piece table (``Clx``) in the table stream, which
+maps character positions to runs of either cp1252 or UTF-16 bytes in the
+``WordDocument`` stream. Only the main document text is returned, headers,
+footnotes and comments follow it in the piece table.
+"""
+from __future__ import annotations
+
+import struct
+
+from dmfo.ole.compound import CompoundFile, CompoundFileError, Source
+
+WORD_STREAM = "WordDocument"
+FIB_IDENT = 0xA5EC
+FIB_FLAGS = 0x0A
+FIB_CCP_TEXT = 0x4C
+FIB_FC_CLX = 0x01A2
+FIB_LCB_CLX = 0x01A6
+F_ENCRYPTED = 0x0100
+F_WHICH_TBL_STM = 0x0200
+CLX_PRC = 0x01
+CLX_PCDT = 0x02
+PCD_SIZE = 8
+FC_COMPRESSED = 0x40000000
+
+FIELD_BEGIN = "\x13"
+FIELD_SEPARATOR = "\x14"
+FIELD_END = "\x15"
+# Paragraph, cell/row and page/section ends
+PARAGRAPH_ENDS = str.maketrans({"\x07": "\r", "\x0c": "\r", "\x0b": "\n"})
+# Anchors of pictures, footnotes, comments, drawings etc.
+CONTROL_CHARS = dict.fromkeys(c for c in range(0x20) if c not in (0x09, 0x0A, 0x0D))
+
+
+def _pieces(table: bytes) -> tuple[list[int], list[int]]:
+    """Returns the character positions and file offsets of the piece table."""
+    offset = 0
+    while offset < len(table):
+        clx_type = table[offset]
+        if clx_type == CLX_PRC:
+            (size,) = struct.unpack_from("<h", table, offset + 1)
+            offset += 3 + size
+        elif clx_type == CLX_PCDT:
+            (size,) = struct.unpack_from("<L", table, offset + 1)
+            count = (size - 4) // (4 + PCD_SIZE)
+            offset += 5
+            cps = list(struct.unpack_from(f"<{count + 1}L", table, offset))
+            offset += (count + 1) * 4
+            fcs = [
+                struct.unpack_from("<L", table, offset + idx * PCD_SIZE + 2)[0]
+                for idx in range(count)
+            ]
+            return cps, fcs
+        else:
+            break
+    raise CompoundFileError("Piece table not found")
+
+
+def _strip_fields(text: str) -> str:
+    """Removes field codes, keeping the field results."""
+    if FIELD_BEGIN not in text:
+        return text
+    result = []
+    # One flag per open field, True while in its code part
+    fields: list[bool] = []
+    for char in text:
+        if char == FIELD_BEGIN:
+            fields.append(True)
+        elif char == FIELD_SEPARATOR and fields:
+            fields[-1] = False
+        elif char == FIELD_END and fields:
+            fields.pop()
+        elif not any(fields):
+            result.append(char)
+    return "".join(result)
+
+
+def read_text(source: Source) -> str:
+    """Returns the main document text of a .doc file."""
+    with CompoundFile(source) as ole:
+        try:
+            return _read_text(ole)
+        except (struct.error, IndexError) as exc:
+            raise CompoundFileError(f"Invalid Word document: {exc}") from None
+
+
+def _read_text(ole: CompoundFile) -> str:
+    stream = ole.open(WORD_STREAM)
+    fib = stream.read_at(0, FIB_LCB_CLX + 4)
+    if len(fib) < FIB_LCB_CLX + 4:
+        raise CompoundFileError("Not a Word document")
+    ident, flags = struct.unpack_from("<H8xH", fib)
+    if ident != FIB_IDENT:
+        raise CompoundFileError("Not a Word document")
+    if flags & F_ENCRYPTED:
+        raise CompoundFileError("Document is encrypted")
+    (ccp_text,) = struct.unpack_from("<l", fib, FIB_CCP_TEXT)
+    fc_clx, lcb_clx = struct.unpack_from("<2L", fib, FIB_FC_CLX)
+
+    table = ole.open("1Table" if flags & F_WHICH_TBL_STM else "0Table")
+    cps, fcs = _pieces(table.read_at(fc_clx, lcb_clx))
+
+    chunks = []
+    remaining = ccp_text
+    for idx, fc in enumerate(fcs):
+        if remaining <= 0:
+            break
+        count = min(cps[idx + 1] - cps[idx], remaining)
+        remaining -= count
+        if fc & FC_COMPRESSED:
+            data = stream.read_at((fc & ~FC_COMPRESSED) // 2, count)
+            chunks.append(data.decode("cp1252", "replace"))
+        else:
+            data = stream.read_at(fc, 2 * count)
+            chunks.append(data.decode("utf-16-le", "replace"))
+    return "".join(chunks)
+
+
+def read_doc_paragraphs(source: Source) -> list[str]:
+    """Returns the paragraph texts of a .doc file."""
+    text = _strip_fields(read_text(source)).translate(PARAGRAPH_ENDS)
+    paragraphs = text.translate(CONTROL_CHARS).split("\r")
+    # The text ends with a paragraph mark
+    if paragraphs and not paragraphs[-1]:
+        paragraphs.pop()
+    return paragraphs
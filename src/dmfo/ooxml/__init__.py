@@ -0,0 +1,6 @@
+from .anomalies import find_anomalies
+from .document import iter_paragraphs, read_paragraphs
+from .media import MediaChange, compare_media
+from .package import Package, open_package, part_index, release_packages
+from .presentation import read_slide_paragraphs, slide_parts
+from .revisions import RevisionReport, count_slide_comments, scan_revisions
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from dmfo.ooxml.media import relationships
+from dmfo.ooxml.package import Source, open_package
+
+EMBEDDING_DIRS = ("word/embeddings/", "ppt/embeddings/", "xl/embeddings/")
+MACRO_PART = "vbaProject.bin"
+# Formats that must not contain macros
+MACRO_FREE_EXTENSIONS = [".docx", ".dotx", ".pptx", ".potx", ".xlsx"]
+
+
+def find_anomalies(source: Source, extension: str) -> list[str]:
+    """Returns descriptions of structural problems of a package: macros in a
+    macro-free format, relationships to missing parts and embedded objects no part
+    refers to.
+    """
+    package = open_package(source)
+    names = set(package.namelist())
+    targets = relationships(package)
+
+    anomalies = []
+    if extension.lower() in MACRO_FREE_EXTENSIONS:
+        anomalies.extend(
+            f"macro project '{name}'"
+            for name in sorted(names)
+            if name.endswith(MACRO_PART)
+        )
+    anomalies.extend(
+        f"relationship '{rel_id}' of '{source_part}' to missing '{target}'"
+        for (source_part, rel_id), target in sorted(targets.items())
+        if target not in names
+    )
+    referenced = set(targets.values())
+    anomalies.extend(
+        f"unreferenced embedded object '{name}'"
+        for name in sorted(names)
+        if name.startswith(EMBEDDING_DIRS) and name not in referenced
+    )
+    return anomalies
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from typing import IO, Iterator
+from xml.etree import ElementTree  # nosec
+
+from dmfo.ooxml.package import Source, open_package
+
+WORD_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+W_BODY = f"{{{WORD_NS}}}body"
+
+DOCUMENT_PART = "word/document.xml"
+
+
+def iter_paragraphs(stream: IO[bytes], namespace: str = WORD_NS) -> Iterator[str]:
+    """Streams the text of all ``p`` elements of a WordprocessingML (or, with the
+    DrawingML ``namespace``, a slide) part in document order. Parsed elements are
+    discarded right away, so memory use does not grow with the document size.
+    """
+    tag_p, tag_t, tag_tab, tag_br, tag_cr = (
+        f"{{{namespace}}}{name}" for name in ("p", "t", "tab", "br", "cr")
+    )
+    stack: list[list[str]] = []
+    body = None
+    for event, elem in ElementTree.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            if elem.tag == tag_p:
+                stack.append([])
+            elif elem.tag == W_BODY:
+                body = elem
+            continue
+
+        if not stack:
+            continue
+        if elem.tag == tag_t:
+            stack[-1].append(elem.text or "")
+        elif elem.tag == tag_tab:
+            stack[-1].append("\t")
+        elif elem.tag in (tag_br, tag_cr):
+            stack[-1].append("\n")
+        elif elem.tag == tag_p:
+            yield "".join(stack.pop())
+            if not stack and body is not None:
+                body.clear()
+
+
+def read_paragraphs(source: Source) -> list[str]:
+    """Returns the paragraph texts of the main document part of a .docx file."""
+    with open_package(source).open(DOCUMENT_PART) as stream:
+        return list(iter_paragraphs(stream))
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import posixpath
+from typing import NamedTuple, Optional
+from xml.etree import ElementTree  # nosec
+
+from dmfo.ooxml.package import STORED, Package, Source, open_package
+
+try:
+    import numpy
+    from PIL import Image
+except ImportError:  # Perceptual similarity is optional (extra "media")
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+MEDIA_DIRS = ("word/media/", "ppt/media/", "Pictures/")
+REL_TAG = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+CHUNK_SIZE = 64 * 1024
+
+
+class MediaChange(NamedTuple):
+    tag: str  # "add", "remove" or "change"
+    old_part: str  # "" for adds
+    new_part: str  # "" for removes
+    similarity: Optional[float]  # perceptual similarity of changed images
+
+
+def hash_media(package: Package) -> dict[str, str]:
+    """Returns the SHA-256 of each media part, hashing stored parts (most images)
+    in place and reading compressed ones in chunks.
+    """
+    digests = {}
+    for name in package.namelist():
+        if not name.startswith(MEDIA_DIRS):
+            continue
+        digest = hashlib.sha256()
+        if package.parts[name].compress_type == STORED:
+            with package.view(name) as view:
+                digest.update(view)
+        else:
+            with package.open(name) as stream:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                    digest.update(chunk)
+        digests[name] = digest.hexdigest()
+    return digests
+
+
+def rels_part(source: str) -> str:
+    """Returns the name of the relationships part of a part."""
+    source_dir, source_name = posixpath.split(source)
+    return posixpath.join(source_dir, "_rels", f"{source_name}.rels")
+
+
+def part_relationships(
+    package: Package, source: str, name: Optional[str] = None
+) -> dict[str, str]:
+    """Maps the relationship IDs of one part to their internal target parts.
+    ``name`` is the relationships part, if not the one of ``source``.
+    """
+    targets = {}
+    with package.open(name or rels_part(source)) as stream:
+        for rel in ElementTree.parse(stream).getroot().iter(REL_TAG):
+            if rel.get("TargetMode") == "External":
+                continue
+            target = rel.get("Target", "")
+            if target.startswith("/"):
+                target = target[1:]
+            else:
+                target = posixpath.join(posixpath.dirname(source), target)
+            targets[rel.get("Id")] = posixpath.normpath(target)
+    return targets
+
+
+def relationships(package: Package) -> dict[tuple[str, str], str]:
+    """Maps ``(source part, relationship ID)`` to the internal target part."""
+    targets = {}
+    for name in package.namelist():
+        if not name.endswith(".rels"):
+            continue
+        rels_dir, rels_name = posixpath.split(name)
+        source = posixpath.join(posixpath.dirname(rels_dir), rels_name[: -len(".rels")])
+        for rel_id, target in part_relationships(package, source, name).items():
+            targets[source, rel_id] = target
+    return targets
+
+
+def similarity(old: bytes, new: bytes) -> Optional[float]:
+    """Perceptual similarity (difference hash) of two images in [0, 1], None if
+    NumPy/Pillow are missing or an image cannot be decoded.
+    """
+    if numpy is None:
+        return None
+    hashes = []
+    for data in (old, new):
+        try:
+            image = Image.open(io.BytesIO(data)).convert("L").resize((17, 16))
+        except OSError:
+            return None
+        pixels = numpy.asarray(image, dtype=numpy.int16)
+        hashes.append(pixels[:, 1:] > pixels[:, :-1])
+    return 1.0 - numpy.count_nonzero(hashes[0] != hashes[1]) / hashes[0].size
+
+
+def compare_media(old_source: Source, new_source: Source) -> list[MediaChange]:
+    """Returns the media parts that really changed between two packages. Media with
+    equal content is matched regardless of its part name, unmatched parts are paired
+    as changed if the same relationship ID (or part name) references them.
+    """
+    old = open_package(old_source)
+    new = open_package(new_source)
+    old_hashes = hash_media(old)
+    new_hashes = hash_media(new)
+
+    old_digests = set(old_hashes.values())
+    new_digests = set(new_hashes.values())
+    removed = {name for name, digest in old_hashes.items() if digest not in new_digests}
+    added = {name for name, digest in new_hashes.items() if digest not in old_digests}
+    logger.debug(
+        "%s media parts, %s unchanged",
+        len(new_hashes),
+        len(new_hashes) - len(added),
+    )
+    if not removed and not added:
+        return []
+
+    pairs = {name: name for name in removed & added}
+    new_rels = relationships(new)
+    for key, old_target in relationships(old).items():
+        new_target = new_rels.get(key)
+        if old_target in removed and new_target in added:
+            pairs.setdefault(old_target, new_target)
+
+    changes = []
+    for old_part, new_part in sorted(pairs.items()):
+        if old_part not in removed or new_part not in added:
+            continue
+        removed.discard(old_part)
+        added.discard(new_part)
+        changes.append(
+            MediaChange(
+                "change",
+                old_part,
+                new_part,
+                similarity(old.read(old_part), new.read(new_part)),
+            )
+        )
+    changes.extend(MediaChange("remove", name, "", None) for name in sorted(removed))
+    changes.extend(MediaChange("add", "", name, None) for name in sorted(added))
+    return changes
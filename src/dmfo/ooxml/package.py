@@ -0,0 +1,294 @@
+"""Random access reader for ZIP based packages (OOXML, ODF).
+
+The file is memory-mapped once and its central directory is parsed into an index of
+part name -> offset/size/CRC. Stored parts are served as ``memoryview`` slices of the
+mapping, deflated parts are inflated while reading. Packages opened by path are
+cached for the whole run, so LFS detection, trivial merge checks and text extraction
+share one mapping per file.
+"""
+from __future__ import annotations
+
+import io
+import mmap
+import os
+import struct
+import zipfile
+import zlib
+from pathlib import Path
+from typing import IO, NamedTuple, Union
+
+EOCD = struct.Struct("<4s4H2LH")
+EOCD_SIGNATURE = b"PK\x05\x06"
+ZIP64_LOCATOR = struct.Struct("<4sLQL")
+ZIP64_LOCATOR_SIGNATURE = b"PK\x06\x07"
+ZIP64_EOCD = struct.Struct("<4sQ2H2L4Q")
+ZIP64_EOCD_SIGNATURE = b"PK\x06\x06"
+CENTRAL_HEADER = struct.Struct("<4s6H3L5H2L")
+CENTRAL_HEADER_SIGNATURE = b"PK\x01\x02"
+LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+ZIP64_EXTRA_ID = 0x0001
+
+STORED = zipfile.ZIP_STORED
+DEFLATED = zipfile.ZIP_DEFLATED
+CHUNK_SIZE = 64 * 1024
+
+Source = Union[Path, bytes, "Package"]
+
+
+class PartInfo(NamedTuple):
+    header_offset: int
+    compress_type: int
+    compress_size: int
+    file_size: int
+    crc: int
+
+
+class _ViewReader(io.RawIOBase):
+    def __init__(self, view: memoryview):
+        self.view = view
+        self.pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        self.view.release()
+        super().close()
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), len(self.view) - self.pos)
+        buffer[:size] = self.view[self.pos : self.pos + size]
+        self.pos += size
+        return size
+
+
+class _InflateReader(io.RawIOBase):
+    def __init__(self, view: memoryview):
+        self.view = view
+        self.pos = 0
+        self.inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+        self.pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        self.view.release()
+        super().close()
+
+    def readinto(self, buffer) -> int:
+        while not self.pending and not self.inflater.eof:
+            chunk = self.view[self.pos : self.pos + CHUNK_SIZE]
+            if not chunk:
+                self.pending = memoryview(self.inflater.flush())
+                break
+            self.pending = memoryview(self.inflater.decompress(chunk, CHUNK_SIZE))
+            # Input the inflater could not consume yet because of max_length
+            self.pos += len(chunk) - len(self.inflater.unconsumed_tail)
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+    def readall(self) -> bytes:
+        data = bytes(self.pending) + self.inflater.decompress(self.view[self.pos :])
+        self.pos = len(self.view)
+        self.pending = memoryview(b"")
+        return data + self.inflater.flush()
+
+
+class Package:
+    def __init__(self, source: Source):
+        self._mmap = None
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self.buffer = memoryview(source)
+        else:
+            with open(source, "rb") as fileobj:
+                try:
+                    self._mmap = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:  # Empty file
+                    raise zipfile.BadZipFile("File is empty") from None
+            self.buffer = memoryview(self._mmap)
+        try:
+            self.parts = self._read_central_directory()
+        except (struct.error, UnicodeDecodeError) as exc:
+            self.close()
+            raise zipfile.BadZipFile(f"Invalid central directory: {exc}") from None
+        except zipfile.BadZipFile:
+            self.close()
+            raise
+
+    def __enter__(self) -> Package:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.buffer.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # A part stream is still open, the file is unmapped once it is
+                # garbage collected
+                pass
+            self._mmap = None
+
+    def _read_central_directory(self) -> dict[str, PartInfo]:
+        buffer = self.buffer
+        start = max(len(buffer) - EOCD.size - 0xFFFF, 0)
+        eocd_offset = bytes(buffer[start:]).rfind(EOCD_SIGNATURE)
+        if eocd_offset == -1:
+            raise zipfile.BadZipFile("File is not a zip file")
+        eocd_offset += start
+        _, _, _, _, count, _, cd_offset, _ = EOCD.unpack_from(buffer, eocd_offset)
+
+        locator_offset = eocd_offset - ZIP64_LOCATOR.size
+        if (
+            locator_offset >= 0
+            and buffer[locator_offset : locator_offset + 4] == ZIP64_LOCATOR_SIGNATURE
+        ):
+            _, _, zip64_offset, _ = ZIP64_LOCATOR.unpack_from(buffer, locator_offset)
+            fields = ZIP64_EOCD.unpack_from(buffer, zip64_offset)
+            if fields[0] != ZIP64_EOCD_SIGNATURE:
+                raise zipfile.BadZipFile("Invalid ZIP64 end of central directory")
+            count, cd_offset = fields[7], fields[9]
+
+        parts = {}
+        offset = cd_offset
+        for _ in range(count):
+            fields = CENTRAL_HEADER.unpack_from(buffer, offset)
+            if fields[0] != CENTRAL_HEADER_SIGNATURE:
+                raise zipfile.BadZipFile("Invalid central directory header")
+            flags, method = fields[3], fields[4]
+            crc, compress_size, file_size = fields[7], fields[8], fields[9]
+            name_len, extra_len, comment_len = fields[10], fields[11], fields[12]
+            header_offset = fields[16]
+            offset += CENTRAL_HEADER.size
+            name = bytes(buffer[offset : offset + name_len]).decode(
+                "utf-8" if flags & 0x800 else "cp437"
+            )
+            offset += name_len
+            if 0xFFFFFFFF in (file_size, compress_size, header_offset):
+                file_size, compress_size, header_offset = self._zip64_extra(
+                    buffer[offset : offset + extra_len],
+                    file_size,
+                    compress_size,
+                    header_offset,
+                )
+            offset += extra_len + comment_len
+            if flags & 0x1:
+                raise zipfile.BadZipFile(f"Part '{name}' is encrypted")
+            parts[name] = PartInfo(header_offset, method, compress_size, file_size, crc)
+        return parts
+
+    @staticmethod
+    def _zip64_extra(
+        extra: memoryview, file_size: int, compress_size: int, header_offset: int
+    ) -> tuple[int, int, int]:
+        offset = 0
+        while offset + 4 <= len(extra):
+            header_id, size = struct.unpack_from("<2H", extra, offset)
+            offset += 4
+            if header_id == ZIP64_EXTRA_ID:
+                values = list(struct.unpack_from(f"<{size // 8}Q", extra, offset))
+                if file_size == 0xFFFFFFFF:
+                    file_size = values.pop(0)
+                if compress_size == 0xFFFFFFFF:
+                    compress_size = values.pop(0)
+                if header_offset == 0xFFFFFFFF:
+                    header_offset = values.pop(0)
+                break
+            offset += size
+        return file_size, compress_size, header_offset
+
+    def namelist(self) -> list[str]:
+        return list(self.parts)
+
+    def index(self) -> dict[str, tuple[int, int]]:
+        """Returns ``{part name: (CRC-32, size)}``."""
+        return {name: (info.crc, info.file_size) for name, info in self.parts.items()}
+
+    def _data(self, name: str) -> tuple[PartInfo, memoryview]:
+        info = self.parts[name]
+        fields = LOCAL_HEADER.unpack_from(self.buffer, info.header_offset)
+        if fields[0] != LOCAL_HEADER_SIGNATURE:
+            raise zipfile.BadZipFile(f"Invalid local header of part '{name}'")
+        start = info.header_offset + LOCAL_HEADER.size + fields[9] + fields[10]
+        return info, self.buffer[start : start + info.compress_size]
+
+    def view(self, name: str) -> memoryview:
+        """Returns a zero-copy view of a stored (uncompressed) part. Release it (or
+        let it be collected) before the file is overwritten, see ``close``.
+        """
+        info, data = self._data(name)
+        if info.compress_type != STORED:
+            data.release()
+            raise ValueError(f"Part '{name}' is compressed")
+        return data
+
+    def open(self, name: str) -> IO[bytes]:
+        """Returns a binary stream of a part's content."""
+        info, data = self._data(name)
+        if info.compress_type == STORED:
+            return io.BufferedReader(_ViewReader(data), CHUNK_SIZE)
+        if info.compress_type == DEFLATED:
+            return io.BufferedReader(_InflateReader(data), CHUNK_SIZE)
+        raise zipfile.BadZipFile(
+            f"Part '{name}' uses unsupported compression {info.compress_type}"
+        )
+
+    def read(self, name: str) -> bytes:
+        info, data = self._data(name)
+        with data:
+            if info.compress_type == DEFLATED:
+                return zlib.decompress(data, -zlib.MAX_WBITS)
+            if info.compress_type == STORED:
+                return bytes(data)
+        raise zipfile.BadZipFile(
+            f"Part '{name}' uses unsupported compression {info.compress_type}"
+        )
+
+
+_cache: dict[str, tuple[tuple[int, int], Package]] = {}
+
+
+def open_package(source: Source) -> Package:
+    """Returns the package of ``source``. Packages of files are cached until the
+    file changes or ``release_packages`` is called; do not close them.
+    """
+    if isinstance(source, Package):
+        return source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return Package(source)
+    key = os.path.realpath(source)
+    stat = os.stat(key)
+    version = (stat.st_size, stat.st_mtime_ns)
+    cached = _cache.get(key)
+    if cached is not None:
+        if cached[0] == version:
+            return cached[1]
+        cached[1].close()
+    package = Package(Path(key))
+    _cache[key] = (version, package)
+    return package
+
+
+def release_packages() -> None:
+    """Unmaps all cached packages. Must be called before files are handed to Office
+    or overwritten, as Windows does not allow that for mapped files.
+    """
+    while _cache:
+        _, (_, package) = _cache.popitem()
+        package.close()
+
+
+def part_index(source: Source) -> dict[str, tuple[int, int]]:
+    """Returns ``{part name: (CRC-32, size)}`` from the central directory of a ZIP
+    package, without decompressing any part. Two packages with equal indexes very
+    likely have the same content, regardless of part order, compression and
+    timestamps; compare the parts to be sure.
+    """
+    return open_package(source).index()
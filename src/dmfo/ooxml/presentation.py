@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from xml.etree import ElementTree  # nosec
+
+from dmfo.ooxml.document import iter_paragraphs
+from dmfo.ooxml.media import part_relationships, rels_part
+from dmfo.ooxml.package import Source, open_package
+
+DRAWING_NS = "http://schemas.openxmlformats.org/drawingml/2006/main"
+PRESENTATION_NS = "http://schemas.openxmlformats.org/presentationml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+P_SLD_ID = f"{{{PRESENTATION_NS}}}sldId"
+R_ID = f"{{{REL_NS}}}id"
+
+PRESENTATION_PART = "ppt/presentation.xml"
+PRESENTATION_RELS_PART = rels_part(PRESENTATION_PART)
+
+
+def slide_parts(source: Source) -> list[str]:
+    """Returns the slide part names of a .pptx file in presentation order. Only
+    reads the presentation part and its relationships.
+    """
+    package = open_package(source)
+    targets = part_relationships(package, PRESENTATION_PART)
+    with package.open(PRESENTATION_PART) as stream:
+        slide_ids = ElementTree.parse(stream).getroot().iter(P_SLD_ID)
+        return [targets[slide_id.get(R_ID)] for slide_id in slide_ids]
+
+
+def read_slide_paragraphs(source: Source) -> list[str]:
+    """Returns the text paragraphs of all slides of a .pptx file in slide order."""
+    package = open_package(source)
+    paragraphs = []
+    for name in slide_parts(package):
+        with package.open(name) as stream:
+            paragraphs.extend(iter_paragraphs(stream, DRAWING_NS))
+    return paragraphs
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from typing import IO, NamedTuple
+from xml.parsers import expat  # nosec
+
+from dmfo.ooxml.document import WORD_NS
+from dmfo.ooxml.package import Source, open_package
+
+# Elements counted by Word as revisions (``Document.Revisions.Count``)
+REVISION_TAGS = {
+    f"{WORD_NS} {tag}"
+    for tag in [
+        "ins",
+        "del",
+        "moveFrom",
+        "moveTo",
+        "rPrChange",
+        "pPrChange",
+        "sectPrChange",
+        "tblPrChange",
+        "trPrChange",
+        "tcPrChange",
+        "numberingChange",
+    ]
+}
+COMMENT_TAG = f"{WORD_NS} commentReference"
+TRACK_REVISIONS_TAG = f"{WORD_NS} trackRevisions"
+VAL_ATTR = f"{WORD_NS} val"
+
+SLIDE_COMMENT_DIR = "ppt/comments/"
+SLIDE_COMMENT_TAG = "cm"
+
+SETTINGS_PART = "word/settings.xml"
+STORY_PARTS = ("document", "header", "footer", "footnotes", "endnotes")
+
+
+class RevisionReport(NamedTuple):
+    revisions: int
+    comments: int
+    track_revisions: bool
+
+
+def _scan(stream: IO[bytes], counts: dict[str, int]) -> None:
+    def start_element(name: str, attrs: dict[str, str]) -> None:
+        if name in REVISION_TAGS:
+            counts["revisions"] += 1
+        elif name == COMMENT_TAG:
+            counts["comments"] += 1
+        elif name == TRACK_REVISIONS_TAG:
+            counts["track_revisions"] = attrs.get(VAL_ATTR, "true") not in (
+                "false",
+                "0",
+                "off",
+            )
+
+    parser = expat.ParserCreate(namespace_separator=" ")
+    parser.StartElementHandler = start_element
+    parser.ParseFile(stream)
+
+
+def scan_revisions(source: Source) -> RevisionReport:
+    """Counts tracked changes and comments in the text stories of a .docx file and
+    reads the Track Changes setting, streaming the XML parts without loading the
+    document.
+    """
+    counts = {"revisions": 0, "comments": 0, "track_revisions": False}
+    package = open_package(source)
+    for name in package.namelist():
+        directory, _, part = name.rpartition("/")
+        if name == SETTINGS_PART or (
+            directory == "word"
+            and part.startswith(STORY_PARTS)
+            and part.endswith(".xml")
+        ):
+            with package.open(name) as stream:
+                _scan(stream, counts)
+    return RevisionReport(**counts)
+
+
+def count_slide_comments(source: Source) -> int:
+    """Counts the comments of a .pptx file (legacy and modern comment parts)."""
+    count = 0
+
+    def start_element(name: str, attrs: dict[str, str]) -> None:
+        nonlocal count
+        if name.rpartition(" ")[2] == SLIDE_COMMENT_TAG:
+            count += 1
+
+    package = open_package(source)
+    for name in package.namelist():
+        if name.startswith(SLIDE_COMMENT_DIR) and name.endswith(".xml"):
+            parser = expat.ParserCreate(namespace_separator=" ")
+            parser.StartElementHandler = start_element
+            with package.open(name) as stream:
+                parser.ParseFile(stream)
+    return count
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import logging
+import subprocess  # nosec
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+LFS_POINTER_PREFIX = b"version https://git-lfs.github.com/spec/"
+
+
+def git(*args: str, stdin: Optional[bytes] = None) -> bytes:
+    return subprocess.run(  # nosec
+        ["git", *args],
+        input=stdin,
+        stdout=subprocess.PIPE,
+        check=True,
+    ).stdout
+
+
+def dmfo_dir() -> Path:
+    """Returns (and creates) the ``dmfo`` directory in the repository's Git dir."""
+    git_dir = Path(git("rev-parse", "--git-common-dir").decode().strip()).resolve()
+    path = git_dir / "dmfo"
+    path.mkdir(exist_ok=True)
+    return path
+
+
+def ls_files(extensions: Iterable[str], *args: str) -> dict[str, str]:
+    """Returns ``{path: blob id}`` of the index entries with one of the given
+    extensions (``args`` are passed to ``git ls-files``).
+    """
+    extensions = tuple(extensions)
+    entries = {}
+    for line in git("ls-files", "-s", "-z", *args).split(b"\0"):
+        if not line:
+            continue
+        info, _, path = line.decode("utf-8").partition("\t")
+        if path.lower().endswith(extensions):
+            entries[path] = info.split()[1]
+    return entries
+
+
+def staged_paths() -> set[str]:
+    """Returns the paths of files added, copied, modified or renamed in the index."""
+    out = git("diff", "--cached", "--name-only", "-z", "--diff-filter=ACMR")
+    return {path.decode("utf-8") for path in out.split(b"\0") if path}
+
+
+def cat_blobs(blob_ids: Iterable[str]) -> Iterator[tuple[str, bytes]]:
+    """Yields ``(blob id, content)`` read through a single ``git cat-file --batch``
+    process, with Git LFS pointers replaced by their content.
+    """
+    with subprocess.Popen(  # nosec
+        ["git", "cat-file", "--batch"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    ) as proc:
+        for blob_id in blob_ids:
+            proc.stdin.write(f"{blob_id}\n".encode())
+            proc.stdin.flush()
+            header = proc.stdout.readline().split()
+            if header[-1] == b"missing":
+                logger.warning("Blob '%s' is missing", blob_id)
+                continue
+            data = proc.stdout.read(int(header[2]))
+            proc.stdout.read(1)
+            yield blob_id, smudge(data)
+        proc.stdin.close()
+
+
+def smudge(data: bytes) -> bytes:
+    """Returns the content of a Git LFS pointer, other data is returned as is."""
+    if data.startswith(LFS_POINTER_PREFIX):
+        data = git("lfs", "smudge", stdin=data)
+    return data
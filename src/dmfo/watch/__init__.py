@@ -0,0 +1,252 @@
+"""``dmfo watch``: re-diff a document against a base version on every save.
+
+The base is parsed once. The working file is re-read on each save, but only the
+parts whose CRC changed since the last save are parsed again (the document part
+of a .docx, single slides of a .pptx, ``content.xml`` of ODF files); the slide
+list of a .pptx is read again only if the presentation part or its relationships
+changed. Other formats are extracted completely. Common leading and trailing
+paragraphs are skipped by the alignment and word level diffs are cached by
+paragraph pair, so a re-diff mostly costs the changed paragraphs.
+"""
+from __future__ import annotations
+
+import html
+import logging
+import os
+import struct
+import sys
+import time
+import zipfile
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Callable, Iterable, Iterator, Optional
+from xml.etree.ElementTree import ParseError  # nosec
+
+import dmfo.extract
+from dmfo.compare import Change, diff_paragraphs
+from dmfo.driver.differ.headless import format_changes
+from dmfo.odf.content import CONTENT_PART, iter_units
+from dmfo.ole import CompoundFileError
+from dmfo.ooxml.document import DOCUMENT_PART, iter_paragraphs
+from dmfo.ooxml.package import Package, release_packages
+from dmfo.ooxml.presentation import (
+    DRAWING_NS,
+    PRESENTATION_PART,
+    PRESENTATION_RELS_PART,
+    slide_parts,
+)
+from dmfo.watch import inotify
+
+logger = logging.getLogger(__name__)
+
+# Word level results kept between saves
+MAX_CACHE_SIZE = 100_000
+CLEAR_SCREEN = "\x1b[2J\x1b[H"
+
+# Extension -> (text parts of a package in order, parts that list depends on, part
+# parser)
+PART_EXTRACTORS: dict[
+    str,
+    tuple[
+        Callable[[Package], list[str]],
+        tuple[str, ...],
+        Callable[[IO[bytes]], Iterator[str]],
+    ],
+] = {
+    ".docx": (lambda package: [DOCUMENT_PART], (), iter_paragraphs),
+    ".pptx": (
+        slide_parts,
+        (PRESENTATION_PART, PRESENTATION_RELS_PART),
+        lambda stream: iter_paragraphs(stream, DRAWING_NS),
+    ),
+    ".odt": (lambda package: [CONTENT_PART], (), iter_units),
+    ".odp": (lambda package: [CONTENT_PART], (), iter_units),
+    ".ods": (lambda package: [CONTENT_PART], (), iter_units),
+}
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<meta http-equiv="refresh" content="1">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; }}
+.change {{ margin: 1em 0; white-space: pre-wrap; }}
+.position {{ color: #888; font-family: monospace; }}
+del {{ background: #fdd; }}
+ins {{ background: #dfd; text-decoration: none; }}
+.move {{ background: #ddf; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<p>{summary}</p>
+{changes}
+</body>
+</html>
+"""
+
+
+class WorkingFile:
+    """Text of a changing document, parsing only the parts changed since the last
+    read.
+    """
+
+    def __init__(self, filename: Path, extension: str):
+        self.filename = filename
+        self.extension = extension.lower()
+        # Part name -> (CRC-32, paragraphs)
+        self.parts: dict[str, tuple[int, list[str]]] = {}
+        # Index entries of the parts the part list depends on, part list
+        self.names: Optional[tuple[tuple, list[str]]] = None
+
+    def read(self) -> list[str]:
+        if self.extension not in PART_EXTRACTORS:
+            return dmfo.extract.paragraphs(self.filename, self.extension)
+
+        list_parts, list_depends, parse = PART_EXTRACTORS[self.extension]
+        # Not cached, so the editor is not blocked from saving over a mapped file
+        with Package(self.filename) as package:
+            index = package.index()
+            key = tuple(index.get(name) for name in list_depends)
+            if self.names is not None and self.names[0] == key:
+                names = self.names[1]
+            else:
+                logger.debug("Reading part list")
+                names = list_parts(package)
+                self.names = (key, names)
+            parts = {}
+            for name in names:
+                crc = index[name][0]
+                cached = self.parts.get(name)
+                if cached is not None and cached[0] == crc:
+                    parts[name] = cached
+                    continue
+                logger.debug("Parsing changed part '%s'", name)
+                with package.open(name) as stream:
+                    parts[name] = (crc, list(parse(stream)))
+        self.parts = parts
+        return [paragraph for name in names for paragraph in parts[name][1]]
+
+
+def _html_words(words: tuple) -> Iterator[str]:
+    for tag, old, new in words:
+        if tag == "equal":
+            yield html.escape(old)
+            continue
+        if old:
+            yield f"<del>{html.escape(old)}</del>"
+        if new:
+            yield f"<ins>{html.escape(new)}</ins>"
+
+
+def format_html(changes: Iterable[Change], title: str, summary: str) -> str:
+    blocks = []
+    for change in changes:
+        if change.tag == "delete":
+            position = f"-{change.old_index + 1}"
+            text = f"<del>{html.escape(change.old_text)}</del>"
+        elif change.tag == "insert":
+            position = f"+{change.new_index + 1}"
+            text = f"<ins>{html.escape(change.new_text)}</ins>"
+        elif change.tag == "move":
+            position = f"-{change.old_index + 1} =&gt; +{change.new_index + 1}"
+            text = f'<span class="move">{html.escape(change.new_text)}</span>'
+        else:
+            position = f"-{change.old_index + 1} +{change.new_index + 1}"
+            text = "".join(_html_words(change.words))
+        blocks.append(
+            f'<div class="change"><div class="position">@@ {position} @@</div>'
+            f"{text}</div>"
+        )
+    return HTML_TEMPLATE.format(
+        title=html.escape(title),
+        summary=html.escape(summary),
+        changes="\n".join(blocks),
+    )
+
+
+def _write_html(filename: Path, content: str) -> None:
+    tmp_filename = filename.with_name(f"{filename.name}.{os.getpid()}.tmp")
+    tmp_filename.write_text(content, encoding="utf-8")
+    os.replace(tmp_filename, filename)
+
+
+def _render(
+    changes: list[Change], title: str, summary: str, html_filename: Optional[Path]
+) -> None:
+    if sys.stdout.isatty():
+        sys.stdout.write(CLEAR_SCREEN)
+    sys.stdout.write(f"{title}\n{summary}\n")
+    for line in format_changes(changes):
+        sys.stdout.write(line + "\n")
+    sys.stdout.flush()
+    if html_filename is not None:
+        _write_html(html_filename, format_html(changes, title, summary))
+
+
+def watch(
+    base: Path,
+    working: Path,
+    html_filename: Optional[Path] = None,
+    interval: float = 0.5,
+) -> int:
+    extension = working.suffix.lower()
+    if not dmfo.extract.supports(extension):
+        logger.critical("DMFO-Watch does not support '%s' files.", extension)
+        return 2
+    for filename in (base, working):
+        if not filename.is_file():
+            logger.critical("File '%s' not found", filename)
+            return 4
+
+    logger.debug("Reading 'BASE' ('%s')", base)
+    base_paragraphs = dmfo.extract.paragraphs(base, extension)
+    logger.debug("Done, %s paragraphs", len(base_paragraphs))
+    release_packages()
+    working_file = WorkingFile(working, extension)
+    title = f"{base.name} => {working.name}"
+    cache: dict = {}
+    paragraphs = None
+
+    def update() -> None:
+        nonlocal paragraphs
+        start = time.perf_counter()
+        try:
+            new_paragraphs = working_file.read()
+        except (
+            zipfile.BadZipFile,
+            CompoundFileError,
+            KeyError,
+            ParseError,
+            OSError,
+            struct.error,
+            zlib.error,
+        ) as exc:
+            # Caught while being written or replaced, the next save triggers
+            # another update
+            logger.debug("Cannot read '%s': '%s'", working, exc)
+            return
+        if new_paragraphs == paragraphs:
+            logger.debug("Text unchanged")
+            return
+        paragraphs = new_paragraphs
+        if len(cache) > MAX_CACHE_SIZE:
+            cache.clear()
+        changes = diff_paragraphs(base_paragraphs, paragraphs, cache=cache)
+        elapsed = (time.perf_counter() - start) * 1000
+        summary = (
+            f"{len(changes)} changes, updated {datetime.now():%H:%M:%S}"
+            f" in {elapsed:.0f} ms"
+        )
+        _render(changes, title, summary, html_filename)
+
+    update()
+    try:
+        for _ in inotify.changes(working, interval=interval):
+            update()
+    except KeyboardInterrupt:
+        logger.debug("Stopped watching")
+    return 0
@@ -0,0 +1,104 @@
+"""Change notifications for a single file, using inotify on Linux (through ctypes,
+no extra dependency) and polling elsewhere.
+
+Editors save in different ways (rewriting the file, or writing a temporary file
+and renaming it over the original), so the directory is watched for files closed
+after writing or moved in, filtered by name.
+"""
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+IN_CLOEXEC = 0o2000000
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+EVENT = struct.Struct("iIII")
+BUFFER_SIZE = 64 * 1024
+# Events arriving within this time (seconds) are handled as one save
+SETTLE_TIME = 0.05
+
+
+def _inotify(directory: Path) -> Optional[int]:
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        fd = libc.inotify_init1(IN_CLOEXEC)
+    except (OSError, AttributeError) as exc:
+        logger.debug("inotify not available: '%s'", exc)
+        return None
+    if fd < 0:
+        logger.debug("inotify_init1 failed: '%s'", os.strerror(ctypes.get_errno()))
+        return None
+    mask = IN_CLOSE_WRITE | IN_MOVED_TO
+    if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+        logger.debug("inotify_add_watch failed: '%s'", os.strerror(ctypes.get_errno()))
+        os.close(fd)
+        return None
+    return fd
+
+
+def _names(data: bytes) -> Iterator[bytes]:
+    offset = 0
+    while offset + EVENT.size <= len(data):
+        _, _, _, length = EVENT.unpack_from(data, offset)
+        offset += EVENT.size
+        yield data[offset : offset + length].rstrip(b"\0")
+        offset += length
+
+
+def _inotify_changes(fd: int, name: bytes) -> Iterator[None]:
+    try:
+        while True:
+            changed = name in _names(os.read(fd, BUFFER_SIZE))
+            # Drain the burst of events of one save
+            while select.select([fd], [], [], SETTLE_TIME)[0]:
+                changed |= name in _names(os.read(fd, BUFFER_SIZE))
+            if changed:
+                yield
+    finally:
+        os.close(fd)
+
+
+def _version(filename: Path) -> Optional[tuple[int, int]]:
+    try:
+        stat = filename.stat()
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _polled_changes(filename: Path, interval: float) -> Iterator[None]:
+    version = _version(filename)
+    while True:
+        time.sleep(interval)
+        new_version = _version(filename)
+        if new_version is not None and new_version != version:
+            version = new_version
+            # Wait until the file stops changing
+            time.sleep(SETTLE_TIME)
+            yield
+
+
+def changes(filename: Path, interval: float = 0.5) -> Iterator[None]:
+    """Yields each time ``filename`` was saved. Without inotify, the file is polled
+    every ``interval`` seconds.
+    """
+    filename = filename.resolve()
+    fd = _inotify(filename.parent)
+    if fd is None:
+        logger.debug("Polling '%s' every %ss", filename, interval)
+        return _polled_changes(filename, interval)
+    logger.debug("Watching '%s' with inotify", filename)
+    return _inotify_changes(fd, os.fsencode(filename.name))